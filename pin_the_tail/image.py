@@ -1,5 +1,13 @@
+import functools
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Iterable, List, Mapping, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 
 import cv2
 import numpy as np
@@ -10,9 +18,36 @@ from PIL import ImageDraw
 from pin_the_tail.location import Point, Region
 from pin_the_tail.ocr import OCRMatcher
 
+try:
+    import mss
+except ImportError:  # pragma: no cover
+    mss = None
+
 FileReferenceType = Union[str, Path]
 NeedleType = Union[str, "BaseImage"]
 
+# A needle smaller than this (in either dimension) is too small to be distinctive, so it isn't downsampled any further
+PYRAMID_MIN_NEEDLE_SIZE = 16
+# A haystack smaller than this (in either dimension) is already quick to search, so it isn't downsampled any further
+PYRAMID_MIN_HAYSTACK_SIZE = 200
+# How many times more dissimilar (i.e. ``1 - confidence``) a candidate found in the downsampled images can be
+PYRAMID_DISSIMILARITY_FACTOR = 2
+# How many pixels around each candidate are searched when refining it in the next larger image
+PYRAMID_SEARCH_RADIUS = 2
+# How many rows of two images are compared at a time when checking whether they are equal
+EQUALITY_BLOCK_ROWS = 128
+# Images of up to this many bytes are compared byte-for-byte, which is faster than calling into OpenCV or numpy for them
+EQUALITY_MAX_BYTES_COMPARED_DIRECTLY = 64 * 1024
+# How many of the most recently searched frames of a dynamic image are remembered while waiting, so that a frame that
+# comes back (e.g. when a cursor blinks) isn't searched again
+SCANNED_FRAMES_REMEMBERED = 4
+# How many of a dynamic image's most recent frames keep their OCR results, so a frame that comes back isn't read again
+OCR_FRAMES_REMEMBERED = 4
+# How many decoded image files are kept, so several ``Image`` objects of the same file only decode it once
+DECODED_FILES_CACHED = 32
+# Haystacks with at least this many pixels are split into bands that are searched in parallel (on multi-core machines)
+PARALLEL_MATCH_MIN_PIXELS = 4_000_000
+
 
 class OutOfBoundsError(Exception):
     pass
@@ -27,26 +62,589 @@ class NeedleNotFoundError(Exception):
         super().__init__(message)
 
 
+def _fits_in_uint8(image: np.ndarray) -> bool:
+    """
+    Whether every value of ``image`` can be stored as ``uint8`` without changing it.
+    """
+    if image.dtype in (np.uint8, np.bool_):
+        return True
+    if not np.issubdtype(image.dtype, np.integer):
+        return False
+    return image.size == 0 or (image.min() >= 0 and image.max() <= 255)
+
+
+def _arrays_equal(first: np.ndarray, second: np.ndarray) -> bool:
+    """
+    Equivalent to ``np.array_equal(first, second)``.
+
+    Two ``uint8`` images are compared by OpenCV, ``EQUALITY_BLOCK_ROWS`` rows at a time, which doesn't allocate a
+    boolean array the size of the images and stops at the first block of rows that differs.  Small ``uint8`` images
+    (e.g. icons) are compared byte-for-byte instead.  An integer array is equal to itself without comparing it (e.g.
+    images of the same file, which share their pixels); a float array isn't, since it may contain NaN.
+    """
+    if first is second and first.dtype.kind in "biu":
+        return True
+    if first.shape != second.shape:
+        return False
+    if first.dtype == second.dtype == np.uint8 and first.nbytes <= EQUALITY_MAX_BYTES_COMPARED_DIRECTLY:
+        return first.tobytes() == second.tobytes()
+    if (
+        first.dtype != np.uint8
+        or second.dtype != np.uint8
+        or first.size == 0
+        or first.ndim not in (2, 3)
+        or (first.ndim == 3 and first.shape[2] > 4)
+    ):
+        return np.array_equal(first, second)
+
+    for top in range(0, first.shape[0], EQUALITY_BLOCK_ROWS):
+        bottom = top + EQUALITY_BLOCK_ROWS
+        if cv2.norm(first[top:bottom], second[top:bottom], cv2.NORM_INF) != 0:
+            return False
+    return True
+
+
+def _as_match_template_input(needle: np.ndarray, haystack: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert the needle and haystack to a datatype supported by ``cv2.matchTemplate`` (``uint8`` or ``float32``).
+
+    The images are kept as (or converted to) ``uint8`` whenever their values fit, since OpenCV's 8-bit path is faster
+    and uses a quarter of the memory.  They are only converted to ``float32`` if they contain values outside of 0-255
+    (e.g. floats or 16-bit images).
+    """
+    if needle.dtype == haystack.dtype and needle.dtype in (np.uint8, np.float32):
+        return needle, haystack
+
+    dtype = np.uint8 if _fits_in_uint8(needle) and _fits_in_uint8(haystack) else np.float32
+    return needle.astype(dtype, copy=False), haystack.astype(dtype, copy=False)
+
+
+@functools.lru_cache(maxsize=DECODED_FILES_CACHED)
+def _read_file_cached(path: str, modified_ns: int, size: int) -> Optional[np.ndarray]:
+    """
+    ``Image._read_file``, keeping the pixels of the most recently decoded files.  The file's modification time and size
+    are part of the key, so a file that changed is decoded again.  The cached pixels are shared between every ``Image``
+    of the file, so they're made read-only.
+    """
+    decoded = Image._read_file(path)
+    if decoded is not None:
+        decoded.flags.writeable = False
+    return decoded
+
+
+class _NeedleSpectrum(NamedTuple):
+    """
+    The Fourier transform of each of a needle's channels, and the sum of its squared pixels, for a given DFT size.
+    """
+
+    spectra: List[np.ndarray]
+    squares: float
+    dft_shape: Tuple[int, int]
+
+
+class _HaystackSpectrum:
+    """
+    The Fourier transform of a haystack, computed once so it can be reused when searching for several needles.
+
+    ``cv2.matchTemplate`` transforms (blocks of) the haystack on every call.  Here, the whole haystack is transformed
+    once, so each needle only costs a transform of the needle, a multiplication, and an inverse transform.  The
+    haystack only needs to be padded to an efficient DFT size, not by the needle's size, since none of the positions
+    where the needle fits within the haystack wrap around.
+
+    Only the ``TM_SQDIFF*`` and ``TM_CCORR*`` methods are supported (see ``METHODS``); their scores match
+    ``cv2.matchTemplate``'s to within floating point error.
+
+    This only pays off for color images, since ``cv2.matchTemplate`` searches each channel of a color needle separately
+    (see ``is_faster``).  For example, searching a 1920x1080 haystack for a 60x30 needle (with its spectrum already
+    computed) took about 75 ms in color, against about 340 ms for ``cv2.matchTemplate``, but in grayscale took about as
+    long as ``cv2.matchTemplate``'s 65 ms or longer.
+    """
+
+    METHODS = (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED, cv2.TM_CCORR, cv2.TM_CCORR_NORMED)
+
+    @classmethod
+    def is_faster(cls, haystack: np.ndarray, match_method) -> bool:
+        """
+        Whether searching ``haystack`` through its spectrum is supported and faster than ``cv2.matchTemplate``.
+        """
+        return match_method in cls.METHODS and haystack.ndim == 3 and haystack.shape[2] > 1
+
+    def __init__(self, haystack: np.ndarray):
+        self.height, self.width = haystack.shape[:2]
+        self.dft_shape = (cv2.getOptimalDFTSize(self.height), cv2.getOptimalDFTSize(self.width))
+
+        channels = haystack.reshape(self.height, self.width, -1)
+        buffer = np.zeros(self.dft_shape, dtype=np.float32)
+        self.spectra = []
+        for channel in range(channels.shape[2]):
+            buffer[: self.height, : self.width] = channels[:, :, channel]
+            self.spectra.append(cv2.dft(buffer, nonzeroRows=self.height))
+
+        # The squared pixels of a uint8 image, summed over up to 4 channels, are integers small enough to be exact in
+        # float32
+        self.squared = np.square(channels, dtype=np.float32).sum(axis=2)
+
+    def transform_needle(self, needle: np.ndarray) -> _NeedleSpectrum:
+        """
+        Compute what ``match_template`` needs from ``needle``, which can be kept to search for the same needle in other
+        haystacks of the same size (e.g. later screenshots).
+        """
+        needle_height, needle_width = needle.shape[:2]
+        channels = needle.reshape(needle_height, needle_width, -1)
+        buffer = np.zeros(self.dft_shape, dtype=np.float32)
+        spectra = []
+        for channel in range(channels.shape[2]):
+            buffer[:needle_height, :needle_width] = channels[:, :, channel]
+            spectra.append(cv2.dft(buffer, nonzeroRows=needle_height))
+        return _NeedleSpectrum(spectra, float(np.square(needle, dtype=np.float64).sum()), self.dft_shape)
+
+    def match_template(
+        self,
+        needle: np.ndarray,
+        match_method=cv2.TM_SQDIFF_NORMED,
+        needle_spectrum: Optional[_NeedleSpectrum] = None,
+    ) -> np.ndarray:
+        """
+        Equivalent to ``cv2.matchTemplate(haystack, needle, match_method)``.
+
+        :param needle: The needle to search for.
+        :param match_method: The match method, which must be in ``METHODS``.
+        :param needle_spectrum: The result of ``transform_needle(needle)``, if already computed.
+        """
+        if match_method not in self.METHODS:
+            raise ValueError(f"Unsupported match method for a haystack spectrum: {match_method}")
+        if needle_spectrum is None or needle_spectrum.dft_shape != self.dft_shape:
+            needle_spectrum = self.transform_needle(needle)
+
+        needle_height, needle_width = needle.shape[:2]
+        result_height, result_width = self.height - needle_height + 1, self.width - needle_width + 1
+
+        product = None
+        for haystack_channel_spectrum, needle_channel_spectrum in zip(self.spectra, needle_spectrum.spectra):
+            channel_product = cv2.mulSpectrums(haystack_channel_spectrum, needle_channel_spectrum, 0, conjB=True)
+            product = channel_product if product is None else cv2.add(product, channel_product)
+
+        cross_correlation = cv2.idft(product, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT, nonzeroRows=result_height)
+        cross_correlation = cross_correlation[:result_height, :result_width]
+        if match_method == cv2.TM_CCORR:
+            return cross_correlation
+
+        # The box filter accumulates float32 images in double precision, so the sums are accurate
+        window_squares = cv2.boxFilter(
+            self.squared,
+            cv2.CV_32F,
+            (needle_width, needle_height),
+            anchor=(0, 0),
+            normalize=False,
+            borderType=cv2.BORDER_CONSTANT,
+        )[:result_height, :result_width]
+        needle_squares = needle_spectrum.squares
+        if match_method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+            numerator = cv2.addWeighted(window_squares, 1, cross_correlation, -2, needle_squares)
+        else:
+            numerator = cross_correlation
+        if match_method == cv2.TM_SQDIFF:
+            return numerator
+
+        # Everything is kept in float32 and computed by OpenCV or in place, since these arrays are as large as the
+        # haystack and this would otherwise take longer than the transforms
+        result = cv2.divide(numerator, cv2.sqrt(cv2.max(window_squares, 0) * needle_squares))
+        # OpenCV treats a division by zero as 0, so the windows whose denominator is zero are found separately
+        blank = window_squares <= 0 if needle_squares > 0 else slice(None)
+        # Same handling of rounding errors and blank areas as OpenCV: a score just outside of -1..1 is rounded to it,
+        # anything further out (or for a blank area) is out of range
+        out_of_range = 1 if match_method == cv2.TM_SQDIFF_NORMED else 0
+        outside = cv2.absdiff(result, 0) >= 1.125
+        np.clip(result, -1, 1, out=result)
+        result[outside] = out_of_range
+        result[blank] = out_of_range
+        return result
+
+
+def _match_template(
+    needle: np.ndarray, haystack: np.ndarray, match_method, bands: int = 1, mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Equivalent to ``cv2.matchTemplate(haystack, needle, match_method, mask=mask)``, optionally splitting the haystack
+    into horizontal ``bands`` that are searched in parallel.
+
+    OpenCV searches for a multi-channel needle using only one thread, but it releases the GIL, so the bands really are
+    searched at the same time.  The bands overlap by the needle's height minus one, so each location is scored once.
+    """
+    needle_height = needle.shape[0]
+    result_height = haystack.shape[0] - needle_height + 1
+    bands = max(1, min(bands, result_height))
+    if bands == 1:
+        return cv2.matchTemplate(haystack, needle, match_method, mask=mask)
+
+    band_height = -(-result_height // bands)
+    result = np.empty((result_height, haystack.shape[1] - needle.shape[1] + 1), dtype=np.float32)
+
+    def match_band(top: int) -> None:
+        bottom = min(top + band_height, result_height)
+        result[top:bottom] = cv2.matchTemplate(
+            haystack[top : bottom + needle_height - 1], needle, match_method, mask=mask
+        )
+
+    list(_get_thread_pool().map(match_band, range(0, result_height, band_height)))
+    return result
+
+
+def _available_threads() -> int:
+    """
+    How many threads OpenCV code can usefully run in parallel.
+    """
+    return max(1, min(cv2.getNumThreads(), os.cpu_count() or 1))
+
+
+_thread_pool = None  # type: Optional[ThreadPoolExecutor]
+_thread_pool_lock = threading.Lock()
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    """
+    The thread pool shared by all searches, which is created (with ``_available_threads()`` threads) the first time it's
+    needed, so searching doesn't start new threads each time.
+
+    Work running in the pool must never wait for other work submitted to the pool, since every thread could end up
+    waiting.  So a search that is already running in the pool must not be split into parallel bands.
+    """
+    global _thread_pool
+    with _thread_pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=_available_threads(), thread_name_prefix="pin_the_tail")
+        return _thread_pool
+
+
+def _map_in_threads(function: Callable[[Any], Any], items: Sequence[Any]) -> List[Any]:
+    """
+    Equivalent to ``[function(item) for item in items]``, but runs in the shared thread pool when there are several
+    items and several CPUs.  This is only useful when ``function`` spends most of its time in code that releases the GIL
+    (e.g. OpenCV).
+    """
+    if min(len(items), _available_threads()) <= 1:
+        return [function(item) for item in items]
+    return list(_get_thread_pool().map(function, items))
+
+
+def _parallel_match_bands(haystack: np.ndarray) -> int:
+    """
+    How many bands to split ``haystack`` into for ``_match_template``.
+    """
+    if haystack.shape[0] * haystack.shape[1] < PARALLEL_MATCH_MIN_PIXELS:
+        return 1
+    return _available_threads()
+
+
+# Flips the score map (in-place) of each match method that scores better matches lower, so higher is always better
+_SCORE_MAP_FLIPS: Dict[int, Callable[[np.ndarray], Any]] = {
+    cv2.TM_SQDIFF: lambda result: np.subtract(result.max(), result, out=result),
+    cv2.TM_SQDIFF_NORMED: lambda result: np.subtract(1, result, out=result),
+}
+# Match methods whose scores don't depend on the rest of the haystack
+_NORMALIZED_MATCH_METHODS = (cv2.TM_SQDIFF_NORMED, cv2.TM_CCORR_NORMED, cv2.TM_CCOEFF_NORMED)
+
+
+def _score_map(
+    needle: np.ndarray,
+    haystack: np.ndarray,
+    match_method=cv2.TM_SQDIFF_NORMED,
+    *,
+    spectrum: Optional[_HaystackSpectrum] = None,
+    needle_spectrum: Optional[_NeedleSpectrum] = None,
+    parallel: bool = True,
+    mask: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Run template matching, returning a score map where higher scores are better matches.
+
+    The ``TM_SQDIFF*`` methods score better matches lower, so their score map is flipped in-place rather than
+    allocating a second map the size of the haystack.  The ``*_NORMED`` methods are normalized by OpenCV using integral
+    images of the haystack, so there is no need to do that here.
+
+    If the haystack's ``spectrum`` is provided (and supports ``match_method``), it is used instead of
+    ``cv2.matchTemplate``, along with the ``needle_spectrum`` if that has already been computed.  If ``parallel`` is
+    true, a large haystack is searched in parallel bands (see ``_match_template``); pass false when already searching in
+    parallel threads.
+
+    If a ``mask`` is given, only the needle's pixels where it is non-zero are compared (the spectrum isn't used).  The
+    normalized methods score a masked needle as ``NaN`` where the haystack is blank under the mask, so those locations
+    are given the worst possible score.
+    """
+    if mask is None and spectrum is not None and match_method in spectrum.METHODS:
+        result = spectrum.match_template(needle, match_method, needle_spectrum)
+    else:
+        needle, haystack = _as_match_template_input(needle, haystack)
+        bands = _parallel_match_bands(haystack) if parallel else 1
+        result = _match_template(needle, haystack, match_method, bands, mask)
+
+    flip = _SCORE_MAP_FLIPS.get(match_method)
+    if flip is not None:
+        flip(result)
+    if mask is not None and match_method in _NORMALIZED_MATCH_METHODS:
+        result[np.isnan(result)] = -np.inf
+    return result
+
+
+def _nonzero_locations(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The x and y coordinates of the true values in the 2D ``mask``, in row-major order.
+
+    Finding the flat indices and splitting them into coordinates is as fast as ``cv2.findNonZero`` when most of the mask
+    is true, and several times faster when few values are (the usual case for matches above a threshold).
+    """
+    ys, xs = np.divmod(np.flatnonzero(mask), mask.shape[1])
+    return xs, ys
+
+
+class _RegionBatch:
+    """
+    The locations and scores of matches found by template matching.
+
+    These are kept as numpy arrays, and ``Region`` objects are only created while iterating over the batch (which yields
+    ``(Region, score)`` tuples).
+    """
+
+    def __init__(self, xs: np.ndarray, ys: np.ndarray, scores: np.ndarray, width: int, height: int):
+        self.xs = xs
+        self.ys = ys
+        self.scores = scores
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_score_map(cls, score_map: np.ndarray, mask: np.ndarray, width: int, height: int) -> "_RegionBatch":
+        xs, ys = _nonzero_locations(mask)
+        return cls(xs, ys, score_map[ys, xs], width, height)
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __iter__(self) -> Iterator[Tuple[Region, float]]:
+        for x, y, score in zip(self.xs.tolist(), self.ys.tolist(), self.scores.tolist()):
+            yield Region(x, y, self.width, self.height), score
+
+
+def _suppress_non_maxima(score_map: np.ndarray, mask: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Reduce ``mask`` to the locations whose score is the highest within a needle-sized neighborhood.
+
+    Neighboring locations with the same score (e.g. a needle matched against a blank area) would all be maxima, so only
+    the first location of each such plateau is kept.
+    """
+    suppressed = np.zeros_like(mask)
+    left, top, mask_width, mask_height = cv2.boundingRect(mask.view(np.uint8))
+    if mask_width == 0 or mask_height == 0:
+        return suppressed
+
+    # Only the area around the candidates can affect them, which can be much smaller than the whole score map (e.g. for
+    # a pyramid search)
+    x_min, y_min = max(left - width, 0), max(top - height, 0)
+    x_max = min(left + mask_width + width, score_map.shape[1])
+    y_max = min(top + mask_height + height, score_map.shape[0])
+    area = score_map[y_min:y_max, x_min:x_max]
+
+    maxima = mask[y_min:y_max, x_min:x_max] & (area == cv2.dilate(area, np.ones((height, width), dtype=np.uint8)))
+    xs, ys = _nonzero_locations(maxima)
+    if len(xs) == 0:
+        return suppressed
+
+    # The locations are in row-major order, so the first location with each label is the first location of its plateau
+    _, labels = cv2.connectedComponents(maxima.view(np.uint8), connectivity=8)
+    _, first_indices = np.unique(labels[ys, xs], return_index=True)
+    suppressed[ys[first_indices] + y_min, xs[first_indices] + x_min] = True
+    return suppressed
+
+
 def _find_all_within(
-    needle: np.ndarray, haystack: np.ndarray, match_threshold: float = 1.0, *, match_method=cv2.TM_SQDIFF_NORMED
-) -> Iterable[Tuple[Region, float]]:
+    needle: np.ndarray,
+    haystack: np.ndarray,
+    match_threshold: float = 1.0,
+    *,
+    match_method=cv2.TM_SQDIFF_NORMED,
+    suppress_overlapping: bool = False,
+    spectrum: Optional[_HaystackSpectrum] = None,
+    needle_spectrum: Optional[_NeedleSpectrum] = None,
+    parallel: bool = True,
+    mask: Optional[np.ndarray] = None,
+) -> _RegionBatch:
     # https://stackoverflow.com/questions/7853628/how-do-i-find-an-image-contained-within-an-image/15147009#15147009
     height, width = needle.shape[:2]
 
-    result = cv2.matchTemplate(needle, haystack, match_method)
-    if match_method == cv2.TM_SQDIFF:
-        result = result.max() - result
-    elif match_method == cv2.TM_SQDIFF_NORMED:
-        result = 1 - result
+    result = _score_map(
+        needle,
+        haystack,
+        match_method,
+        spectrum=spectrum,
+        needle_spectrum=needle_spectrum,
+        parallel=parallel,
+        mask=mask,
+    )
+    mask = result >= match_threshold
+    if suppress_overlapping:
+        mask = _suppress_non_maxima(result, mask, width, height)
+    return _RegionBatch.from_score_map(result, mask, width, height)
+
+
+def _find_best_within(
+    needle: np.ndarray,
+    haystack: np.ndarray,
+    match_threshold: float = 1.0,
+    *,
+    match_method=cv2.TM_SQDIFF_NORMED,
+    spectrum: Optional[_HaystackSpectrum] = None,
+    needle_spectrum: Optional[_NeedleSpectrum] = None,
+    parallel: bool = True,
+    mask: Optional[np.ndarray] = None,
+) -> Optional[Tuple[Region, float]]:
+    """
+    Find the best match of ``needle`` in ``haystack``, or ``None`` if the best match's score is below the threshold.
+    """
+    height, width = needle.shape[:2]
+
+    result = _score_map(
+        needle,
+        haystack,
+        match_method,
+        spectrum=spectrum,
+        needle_spectrum=needle_spectrum,
+        parallel=parallel,
+        mask=mask,
+    )
+    y, x = np.unravel_index(np.argmax(result), result.shape)
+    score = float(result[y, x])
+    if score < match_threshold:
+        return None
+    return Region(int(x), int(y), width, height), score
+
+
+def _build_pyramid(image: np.ndarray, levels: int) -> List[np.ndarray]:
+    pyramid = [image]
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+    return pyramid
+
+
+def _find_all_within_pyramid(
+    needle: np.ndarray,
+    haystack: np.ndarray,
+    match_threshold: float = 1.0,
+    *,
+    match_method=cv2.TM_SQDIFF_NORMED,
+    levels: int = 2,
+    suppress_overlapping: bool = False,
+    parallel: bool = True,
+    mask: Optional[np.ndarray] = None,
+) -> _RegionBatch:
+    """
+    Coarse-to-fine version of ``_find_all_within``.
+
+    The needle and haystack are repeatedly halved in size (up to ``levels`` times, as long as they stay at least
+    ``PYRAMID_MIN_NEEDLE_SIZE`` and ``PYRAMID_MIN_HAYSTACK_SIZE``) and the search is done on the smallest images with a
+    relaxed threshold (see ``PYRAMID_DISSIMILARITY_FACTOR``).  Each candidate is then refined by searching only a small
+    neighborhood around it in the next larger images, until reaching the original images.  Scores are computed on the
+    original images, so they are the same as those from ``_find_all_within``, but matches whose downsampled score falls
+    below the relaxed threshold will be missed.
+
+    Only the normalized match methods are supported since the other methods' scores depend on what else is in the
+    haystack.  For other methods (or images too small to downsample, or a masked needle), this falls back to
+    ``_find_all_within``, which is passed ``parallel``.  The downsampled searches are small, so they are never split
+    into parallel bands.
+    """
+    height, width = needle.shape[:2]
+    haystack_size = min(haystack.shape[:2])
+    while levels > 0 and (
+        min(height, width) >> levels < PYRAMID_MIN_NEEDLE_SIZE or haystack_size >> levels < PYRAMID_MIN_HAYSTACK_SIZE
+    ):
+        levels -= 1
+    if levels <= 0 or match_method not in _NORMALIZED_MATCH_METHODS or mask is not None:
+        return _find_all_within(
+            needle,
+            haystack,
+            match_threshold,
+            match_method=match_method,
+            suppress_overlapping=suppress_overlapping,
+            parallel=parallel,
+            mask=mask,
+        )
 
-    locations = np.where(result >= match_threshold)
-    scores = result[locations]
-    return ((Region(x, y, width, height), score) for (x, y), score in zip(zip(*locations[::-1]), scores))
+    needles = _build_pyramid(needle, levels)
+    haystacks = _build_pyramid(haystack, levels)
+    relaxed_threshold = 1 - (1 - match_threshold) * PYRAMID_DISSIMILARITY_FACTOR
+
+    # Nearby candidates are refined together (using the bounding box of each connected group of candidates), so a
+    # large area of weak candidates costs at most one full search of that area instead of one search per candidate.
+    candidates = _score_map(needles[-1], haystacks[-1], match_method, parallel=False) >= relaxed_threshold
+    for level in range(levels - 1, -1, -1):
+        level_needle = needles[level]
+        level_haystack = haystacks[level]
+        level_height, level_width = level_needle.shape[:2]
+        threshold = match_threshold if level == 0 else relaxed_threshold
+
+        refined = np.full(
+            (level_haystack.shape[0] - level_height + 1, level_haystack.shape[1] - level_width + 1),
+            -np.inf,
+            dtype=np.float32,
+        )
+        n_groups, _, stats, _ = cv2.connectedComponentsWithStats(candidates.astype(np.uint8), connectivity=8)
+        for group_x, group_y, group_width, group_height, _ in stats[1:n_groups]:
+            left = max(2 * group_x - PYRAMID_SEARCH_RADIUS, 0)
+            top = max(2 * group_y - PYRAMID_SEARCH_RADIUS, 0)
+            right = min(2 * (group_x + group_width - 1) + PYRAMID_SEARCH_RADIUS, refined.shape[1] - 1)
+            bottom = min(2 * (group_y + group_height - 1) + PYRAMID_SEARCH_RADIUS, refined.shape[0] - 1)
+            if right < left or bottom < top:
+                continue
+
+            window = level_haystack[top : bottom + level_height, left : right + level_width]
+            refined[top : bottom + 1, left : right + 1] = _score_map(level_needle, window, match_method, parallel=False)
+
+        candidates = refined >= threshold
+
+    if suppress_overlapping:
+        candidates = _suppress_non_maxima(refined, candidates, width, height)
+    return _RegionBatch.from_score_map(refined, candidates, width, height)
+
+
+def _paced_scans(timeout: float, scans_per_second: float) -> Iterator[None]:
+    """
+    Yields once for each scan while waiting on something to happen, sleeping in between so that scans start
+    ``1 / scans_per_second`` seconds apart.
+
+    The scans are scheduled from when waiting started (rather than sleeping a fixed amount after each scan), so the time
+    spent scanning doesn't push the later scans past ``timeout``.  A scan that runs past the start of the next one is
+    followed immediately by the next scan.  There is always at least one scan, and no sleeping after the last one.
+
+    :param timeout: How many seconds to keep scanning for.
+    :param scans_per_second: How many times per second to scan.
+    """
+    start = time.monotonic()
+    scan_count = 0
+    while True:
+        yield
+        scan_count += 1
+        # The scan count is compared instead of the time of the next scan, so that rounding doesn't add a scan
+        if scan_count >= timeout * scans_per_second:
+            return
+
+        delay = start + scan_count / scans_per_second - time.monotonic()
+        if delay > 0:
+            pyautogui.sleep(delay)
+        elif time.monotonic() >= start + timeout:
+            return
 
 
 class BaseImage:
+    # Whether the image can change between calls to ``_get_numpy_image`` (e.g. the live screen).  Nothing derived from
+    # the pixels of a dynamic image should be cached, unless it's checked against the current frame before being used.
+    _is_dynamic = False
+
     def __init__(self):
         self._ocr_matchers = {}
+        self._ocr_frames: deque = deque(maxlen=OCR_FRAMES_REMEMBERED)
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._grayscale_image: Optional[np.ndarray] = None
+        self._haystack_spectra: Dict[bool, _HaystackSpectrum] = {}
+        self._needle_spectra: Dict[bool, _NeedleSpectrum] = {}
 
     def _get_numpy_image(self) -> np.ndarray:
         """
@@ -57,13 +655,119 @@ class BaseImage:
     def _get_pil_image(self) -> PILImage.Image:
         return PILImage.fromarray(self._get_numpy_image())
 
+    def _get_mask(self) -> Optional[np.ndarray]:
+        """
+        Which pixels to compare when searching for this image (where the mask is non-zero), or ``None`` to compare every
+        pixel.  Only images with transparent pixels have a mask.
+        """
+        return None
+
+    def _get_grayscale_numpy_image(self) -> np.ndarray:
+        """
+        A single-channel (grayscale) version of the image.
+        """
+        if self._grayscale_image is not None:
+            return self._grayscale_image
+
+        image = self._get_numpy_image()
+        if image.shape[2] in (1, 2):
+            # Already grayscale (e.g. a PIL "L" or "LA" image), so its gray channel is used as it is
+            grayscale_image = np.ascontiguousarray(image[:, :, 0])
+        elif image.shape[2] in (3, 4):
+            if image.dtype not in (np.uint8, np.uint16, np.float32):
+                # These are the only datatypes ``cv2.cvtColor`` converts, and ``cv2.matchTemplate`` searches floats as
+                # ``float32`` anyway
+                image = image.astype(np.float32)
+            grayscale_image = cv2.cvtColor(image, cv2.COLOR_RGBA2GRAY if image.shape[2] == 4 else cv2.COLOR_RGB2GRAY)
+        else:
+            # There's no grayscale conversion for other numbers of channels, so these are searched as they are
+            grayscale_image = image
+        if not self._is_dynamic:
+            self._grayscale_image = grayscale_image
+        return grayscale_image
+
+    def _get_haystack_spectrum(self, numpy_image: np.ndarray, grayscale: bool) -> _HaystackSpectrum:
+        """
+        The spectrum of ``numpy_image``, which must be this image's (grayscale, if ``grayscale`` is true) pixels.
+        """
+        spectrum = self._haystack_spectra.get(grayscale)
+        if spectrum is None:
+            spectrum = _HaystackSpectrum(numpy_image)
+            if not self._is_dynamic:
+                self._haystack_spectra[grayscale] = spectrum
+        return spectrum
+
+    def _get_needle_spectrum(
+        self, spectrum: _HaystackSpectrum, numpy_image: np.ndarray, grayscale: bool
+    ) -> _NeedleSpectrum:
+        """
+        This image's transform for searching for it within the haystack ``spectrum``, where ``numpy_image`` must be
+        this image's (grayscale, if ``grayscale`` is true) pixels.  It is kept for searching haystacks of the same size,
+        such as later screenshots.
+        """
+        needle_spectrum = self._needle_spectra.get(grayscale)
+        if needle_spectrum is None or needle_spectrum.dft_shape != spectrum.dft_shape:
+            needle_spectrum = spectrum.transform_needle(numpy_image)
+            if not self._is_dynamic:
+                self._needle_spectra[grayscale] = needle_spectrum
+        return needle_spectrum
+
+    @contextmanager
+    def _single_frame(self) -> Iterator["BaseImage"]:
+        """
+        Within the context, every access of a dynamic image's pixels sees the same frame (e.g. the same screenshot).  A
+        static image always shows the same frame, so this does nothing for them.
+        """
+        yield self
+
+    def _scan_new_frames(self, timeout: float, scans_per_second: float) -> Iterator[None]:
+        """
+        Paces the scans while waiting (see ``_paced_scans``), yielding within ``_single_frame`` for each scan.  For a
+        dynamic image, a scan whose frame is the same as one of the last ``SCANNED_FRAMES_REMEMBERED`` frames scanned is
+        skipped, since searching it again would find the same result.
+        """
+        scanned_frames: deque = deque(maxlen=SCANNED_FRAMES_REMEMBERED)
+        for _ in _paced_scans(timeout, scans_per_second):
+            with self._single_frame():
+                if self._is_dynamic:
+                    frame = self._get_numpy_image()
+                    if any(_arrays_equal(frame, scanned_frame) for scanned_frame in scanned_frames):
+                        continue
+                    scanned_frames.appendleft(frame)
+                yield
+
+    def _get_shape(self) -> Tuple[int, ...]:
+        if self._is_dynamic:
+            return self._get_numpy_image().shape
+        if self._shape is None:
+            self._shape = self._get_numpy_image().shape
+        return self._shape
+
     def get_as_inverted_colors(self) -> "Image":
         numpy_image = self._get_numpy_image()
         has_alpha = numpy_image.shape[2] == 4
-
-        inverted_colors = 255 - numpy_image[:, :, :3]
+        mask = None if has_alpha else self._get_mask()
+
+        if mask is not None:
+            # Keep the masked out pixels transparent, so they're still ignored when searching.  The alpha channel is
+            # added before inverting (rather than stacked onto the inverted colors) so the colors are only copied once.
+            if numpy_image.dtype == np.uint8:
+                inverted_colors = cv2.cvtColor(numpy_image, cv2.COLOR_RGB2RGBA)
+                cv2.bitwise_not(inverted_colors, dst=inverted_colors)
+            else:
+                inverted_colors = np.empty(numpy_image.shape[:2] + (4,), dtype=numpy_image.dtype)
+                np.subtract(255, numpy_image, out=inverted_colors[:, :, :3])
+            np.multiply(mask, 255, out=inverted_colors[:, :, 3])
+            return Image(inverted_colors)
+
+        # Inverting every channel (rather than a strided view of just the colors) and then restoring the alpha channel
+        # avoids stacking the alpha channel back onto a copy of the inverted colors
+        if numpy_image.dtype == np.uint8:
+            inverted_colors = cv2.bitwise_not(numpy_image)
+        else:
+            inverted_colors = 255 - numpy_image
         if has_alpha:
-            inverted_colors = np.dstack((inverted_colors, numpy_image[:, :, 3]))
+            inverted_colors[:, :, 3] = numpy_image[:, :, 3]
 
         return Image(inverted_colors)
 
@@ -73,7 +777,9 @@ class BaseImage:
         """
         if not isinstance(other, BaseImage):
             return NotImplemented  # pragma: no cover
-        return np.array_equal(self._get_numpy_image(), other._get_numpy_image())
+        # A static image returns the same array each time, so ``_arrays_equal`` only compares its pixels when they may
+        # contain NaN
+        return _arrays_equal(self._get_numpy_image(), other._get_numpy_image())
 
     def save(self, location) -> None:
         return self._get_pil_image().save(location)
@@ -83,14 +789,14 @@ class BaseImage:
         """
         Width of the image.
         """
-        return self._get_numpy_image().shape[1]
+        return self._get_shape()[1]
 
     @property
     def height(self) -> int:
         """
         Height of the image.
         """
-        return self._get_numpy_image().shape[0]
+        return self._get_shape()[0]
 
     @property
     def region(self) -> Region:
@@ -136,10 +842,12 @@ class BaseImage:
         if region.top < 0:
             raise OutOfBoundsError(f"region.y={region.top}.  Value must be at least zero.")
 
-        if region.right > self.width:
-            raise OutOfBoundsError(f"region.right={region.right}.  Value exceeds size of image (width={self.width}).")
-        if region.bottom > self.height:
-            raise OutOfBoundsError(f"region.left={region.left}.  Value exceeds size of image (height={self.height}).")
+        # Read the size once, since each read of a dynamic image's size (e.g. the screen) takes a new screenshot
+        height, width = self._get_shape()[:2]
+        if region.right > width:
+            raise OutOfBoundsError(f"region.right={region.right}.  Value exceeds size of image (width={width}).")
+        if region.bottom > height:
+            raise OutOfBoundsError(f"region.bottom={region.bottom}.  Value exceeds size of image (height={height}).")
 
         return RegionInImage(self, region)
 
@@ -149,12 +857,32 @@ class BaseImage:
         )
 
     def _get_ocr_matcher(self, language, line_break, paragraph_break):
-        # TODO: OCRMatcher can probably be rewritten so it only really depends on language (i.e. _process can be run
-        # TODO: when-needed and so line_break and paragraph_break can be updated)
-        matcher = self._ocr_matchers.get((language, line_break, paragraph_break))
-        if matcher is None:
-            matcher = self._create_ocr_matcher(language, line_break, paragraph_break)
-            self._ocr_matchers[(language, line_break, paragraph_break)] = matcher
+        with self._single_frame():
+            if self._is_dynamic:
+                # The OCR of a dynamic image is kept for each of its most recent frames (as ``(frame, matchers)``, most
+                # recently used first), and only reused when the image shows one of those frames again
+                frame = self._get_numpy_image()
+                for index, ocr_frame in enumerate(self._ocr_frames):
+                    if _arrays_equal(frame, ocr_frame[0]):
+                        del self._ocr_frames[index]
+                        break
+                else:
+                    ocr_frame = (frame, {})
+                self._ocr_frames.appendleft(ocr_frame)
+                self._ocr_matchers = ocr_frame[1]
+
+            matcher = self._ocr_matchers.get((language, line_break, paragraph_break))
+            if matcher is None:
+                # Only the language changes what Tesseract reads, so a matcher for the same language is reused with the
+                # new breaks if there is one
+                same_language = [
+                    other for (other_language, _, _), other in self._ocr_matchers.items() if other_language == language
+                ]
+                if same_language:
+                    matcher = same_language[0].with_breaks(line_break, paragraph_break)
+                else:
+                    matcher = self._create_ocr_matcher(language, line_break, paragraph_break)
+                self._ocr_matchers[(language, line_break, paragraph_break)] = matcher
         return matcher
 
     def get_text(self, *, language: Optional[str] = None, line_break: str = "\n", paragraph_break: str = "\n\n") -> str:
@@ -177,39 +905,116 @@ class BaseImage:
         confidence: float = 0.99,
         *,
         match_method=cv2.TM_SQDIFF_NORMED,
+        pyramid_levels: int = 0,
+        grayscale: bool = True,
+        suppress_overlapping: bool = True,
+        shared_spectrum: bool = False,
     ) -> List["MatchedRegionInImage"]:
         """
         Find all locations of ``needle`` in the image.
 
-        If all needles have at least one dimension larger than the haystack, then an empty list will be returned
-        because no needle could even fit in the haystack.
+        Needles with at least one dimension larger than the haystack are skipped, since they can't even fit in the
+        haystack.  If no needle fits, then an empty list will be returned.
 
-        :param needle: Image or iterable of images to find.
+        :param needle: Image or iterable of images to find.  Pixels of a needle that aren't fully opaque are ignored,
+            in which case the needle is searched for without ``pyramid_levels`` or ``shared_spectrum``.
         :param confidence: Sets the confidence threshold.  If the found image is at least this similar, then it is
             considered a match.  Defaults to 0.99 (99%).  Setting the threshold to 1 (i.e. 100%) may result in false
             negatives (i.e. exact matches not being found).
         :param match_method: What technique should openCV's image matching method use?
+        :param pyramid_levels: When greater than zero, search downsampled copies of the images first (halving their
+            size up to this many times) and only search the full-size images around the candidates found.  This is much
+            faster for large needles, but may miss matches that are only found at full size.  Only used with the
+            normalized match methods.
+        :param grayscale: If true (default), the images are converted to grayscale before searching, which is about
+            three times faster but cannot tell apart colors with the same brightness.  Set it to false to compare the
+            colors.
+        :param suppress_overlapping: If true (default), only keep a match if it is the best match within a needle-sized
+            area around it, so each match is only found once.  If false, a lower ``confidence`` often finds the same
+            match several times, offset by a pixel or two.
+        :param shared_spectrum: If true, compute the image's Fourier transform once (keeping it, unless the image is
+            dynamic) and reuse it for every needle, instead of OpenCV transforming the image again for each needle.
+            When searching in color (``grayscale=False``), this is several times faster, especially for several
+            needles or large needles.  Each needle's transform (which is as large as the image's) is also kept, for
+            searching later images of the same size, e.g. while waiting for the needle to appear on the screen.  Only
+            used with ``grayscale=False``, the ``TM_SQDIFF*`` and ``TM_CCORR*`` match methods, and when not using
+            ``pyramid_levels``.  In grayscale, OpenCV's own search is at least as fast, so it's used instead.
         :return: Regions containing the found image(s). The regions are not in sorted order.
         """
-        if isinstance(needle, BaseImage):
-            needle = [needle]
+        needle = [needle] if isinstance(needle, BaseImage) else list(needle)
+        if not needle:
+            # ``find_all`` passes an empty list when it only has text needles, which shouldn't take a screenshot
+            return []
 
-        if all(needle_part.width > self.width or needle_part.height > self.height for needle_part in needle):
+        numpy_image = self._get_grayscale_numpy_image() if grayscale else self._get_numpy_image()
+        height, width = numpy_image.shape[:2]
+        # OpenCV can't search for a needle that doesn't fit in the haystack (and silently swaps them when the needle is
+        # larger in both dimensions), so those needles are skipped
+        needle = [needle_part for needle_part in needle if needle_part.width <= width and needle_part.height <= height]
+        if not needle:
             return []
 
-        numpy_image = self._get_numpy_image()
-        all_found = []  # type: List[MatchedRegionInImage]
-        for needle_part in needle:
-            results = _find_all_within(
-                needle_part._get_numpy_image(), numpy_image, confidence, match_method=match_method
-            )
-            all_found.extend(
-                MatchedRegionInImage.from_region_in_image(self.get_child_region(region), needle_part, score)
-                for region, score in results
+        spectrum = None
+        if shared_spectrum and pyramid_levels <= 0 and _HaystackSpectrum.is_faster(numpy_image, match_method):
+            spectrum = self._get_haystack_spectrum(numpy_image, grayscale)
+
+        # Several needles are searched for in parallel threads (OpenCV releases the GIL), so each search is kept to one
+        # thread
+        parallel_needles = len(needle) > 1 and _available_threads() > 1
+
+        def search(needle_part_and_image: Tuple[BaseImage, np.ndarray, Optional[np.ndarray]]) -> _RegionBatch:
+            needle_part, needle_image, needle_mask = needle_part_and_image
+            if pyramid_levels > 0:
+                return _find_all_within_pyramid(
+                    needle_image,
+                    numpy_image,
+                    confidence,
+                    match_method=match_method,
+                    levels=pyramid_levels,
+                    suppress_overlapping=suppress_overlapping,
+                    parallel=not parallel_needles,
+                    mask=needle_mask,
+                )
+            needle_spectrum = None
+            if spectrum is not None and needle_mask is None:
+                needle_spectrum = needle_part._get_needle_spectrum(spectrum, needle_image, grayscale)
+            return _find_all_within(
+                needle_image,
+                numpy_image,
+                confidence,
+                match_method=match_method,
+                suppress_overlapping=suppress_overlapping,
+                spectrum=spectrum,
+                needle_spectrum=needle_spectrum,
+                parallel=not parallel_needles,
+                mask=needle_mask,
             )
 
+        # The matches are within the image by construction, so they skip ``get_child_region``'s bounds checks, which
+        # would take a new screenshot per match for a dynamic image
+        all_found = []  # type: List[MatchedRegionInImage]
+        for needle_part, results in zip(needle, _map_in_threads(search, self._get_needle_images(needle, grayscale))):
+            all_found.extend(MatchedRegionInImage(self, region, needle_part, score) for region, score in results)
+
         return all_found
 
+    @staticmethod
+    def _get_needle_images(
+        needles: List["BaseImage"], grayscale: bool
+    ) -> List[Tuple["BaseImage", np.ndarray, Optional[np.ndarray]]]:
+        """
+        Pair each needle with its pixels and mask.  These are retrieved before searching in parallel threads, so that
+        images such as the screen are only accessed from the calling thread.
+        """
+        return [
+            (
+                needle,
+                needle._get_grayscale_numpy_image() if grayscale else needle._get_numpy_image(),
+                needle._get_mask(),
+            )
+            for needle in needles
+        ]
+
     def find_text_all(
         self,
         needle: Union[str, Iterable[str]],
@@ -237,18 +1042,23 @@ class BaseImage:
         :param paragraph_break:  The string to use when concatenating two OCR'ed paragraphs.
         :return: Regions containing the found text.
         """
-        if isinstance(needle, str):
-            needle = [needle]
+        needle = [needle] if isinstance(needle, str) else list(needle)
+        if not needle:
+            # ``find_all`` passes an empty list when it only has image needles, which shouldn't run the OCR (which is
+            # repeated every scan while waiting on a dynamic image)
+            return []
 
         matcher = self._get_ocr_matcher(language, line_break, paragraph_break)
 
+        # The OCR'ed regions are within the image, so they skip ``get_child_region``'s bounds checks (see
+        # ``find_image_all``)
         all_found = []  # type: List[MatchedRegionInImage]
         for needle_part in needle:
-            results = matcher.find_all(needle_part, regex=regex, regex_flags=regex_flags)
+            # Compiled once here so searching for each occurrence reuses the pattern
+            pattern = re.compile(needle_part, regex_flags) if regex else needle_part
+            results = matcher.find_all(pattern)
             all_found.extend(
-                MatchedRegionInImage.from_region_in_image(
-                    self.get_child_region(result.region), needle_part, result.confidence
-                )
+                MatchedRegionInImage(self, result.region, needle_part, result.confidence)
                 for result in results
                 if result.confidence >= confidence
             )
@@ -324,11 +1134,68 @@ class BaseImage:
             found, ``None`` is returned.  If ``needle`` is a collection, then the best overall match will be returned.
             To get the best match for each needle, call ``find_image`` on each image individually.
         """
-        result = self.find_image_all(needle, *([confidence] if confidence is not None else []), **kwargs)
-        result = sorted(result, key=lambda res: res.confidence, reverse=True)
-        if result:
-            return result[0]
-        return None
+        confidence_args = [confidence] if confidence is not None else []
+        if kwargs.get("pyramid_levels", 0) > 0:
+            result = self.find_image_all(needle, *confidence_args, **kwargs)
+            return max(result, key=lambda res: res.confidence, default=None)
+
+        # The best match is never suppressed by an overlapping match, so this doesn't change the result.  No pyramid is
+        # used here (``pyramid_levels`` is missing or not positive).
+        kwargs.pop("suppress_overlapping", None)
+        kwargs.pop("pyramid_levels", None)
+        return self._find_best_image(needle, *confidence_args, **kwargs)
+
+    def _find_best_image(
+        self,
+        needle: Union["BaseImage", Iterable["BaseImage"]],
+        confidence: float = 0.99,
+        *,
+        match_method=cv2.TM_SQDIFF_NORMED,
+        grayscale: bool = True,
+        shared_spectrum: bool = False,
+    ) -> Optional["MatchedRegionInImage"]:
+        """
+        Find the best match for ``needle`` by taking the highest score of each needle's score map, rather than gathering
+        every match above the threshold and then picking the best one.  See ``find_image_all`` for the parameters.
+        """
+        needle = [needle] if isinstance(needle, BaseImage) else list(needle)
+
+        numpy_image = self._get_grayscale_numpy_image() if grayscale else self._get_numpy_image()
+        spectrum = None
+        if shared_spectrum and _HaystackSpectrum.is_faster(numpy_image, match_method):
+            spectrum = self._get_haystack_spectrum(numpy_image, grayscale)
+
+        height, width = numpy_image.shape[:2]
+        needle = [needle_part for needle_part in needle if needle_part.width <= width and needle_part.height <= height]
+        parallel_needles = len(needle) > 1 and _available_threads() > 1
+
+        def search(
+            needle_part_and_image: Tuple[BaseImage, np.ndarray, Optional[np.ndarray]],
+        ) -> Optional[Tuple[Region, float]]:
+            needle_part, needle_image, needle_mask = needle_part_and_image
+            needle_spectrum = None
+            if spectrum is not None and needle_mask is None:
+                needle_spectrum = needle_part._get_needle_spectrum(spectrum, needle_image, grayscale)
+            return _find_best_within(
+                needle_image,
+                numpy_image,
+                confidence,
+                match_method=match_method,
+                spectrum=spectrum,
+                needle_spectrum=needle_spectrum,
+                parallel=not parallel_needles,
+                mask=needle_mask,
+            )
+
+        best = None  # type: Optional[Tuple[Region, BaseImage, float]]
+        for needle_part, found in zip(needle, _map_in_threads(search, self._get_needle_images(needle, grayscale))):
+            if found is not None and (best is None or found[1] > best[2]):
+                best = (found[0], needle_part, found[1])
+
+        if best is None:
+            return None
+        region, needle_part, score = best
+        return MatchedRegionInImage(self, region, needle_part, score)
 
     def find_text(
         self, needle: Union[str, Iterable[str]], confidence: Optional[float] = None, **kwargs
@@ -347,10 +1214,7 @@ class BaseImage:
             To get the best match for each needle, call ``find_text`` on each image individually.
         """
         result = self.find_text_all(needle, *([confidence] if confidence is not None else []), **kwargs)
-        result = sorted(result, key=lambda res: res.confidence, reverse=True)
-        if result:
-            return result[0]
-        return None
+        return max(result, key=lambda res: res.confidence, default=None)
 
     def find(
         self,
@@ -378,10 +1242,7 @@ class BaseImage:
             text_kwargs=text_kwargs,
             image_kwargs=image_kwargs,
         )
-        result = sorted(result, key=lambda res: res.confidence, reverse=True)
-        if result:
-            return result[0]
-        return None
+        return max(result, key=lambda res: res.confidence, default=None)
 
     def wait_until_appears(
         self,
@@ -408,16 +1269,11 @@ class BaseImage:
         :return: Regions containing the found needle(s). The regions are not in sorted order.  If ``timeout`` is reached
             and the needle did not appear, then an empty list will be returned.
         """
-        scan_count = 0 if timeout * scans_per_second > 0 else -1  # We want the loop to occur at least once
-        result = []
-        while scan_count < timeout * scans_per_second:
+        result = []  # type: List[MatchedRegionInImage]
+        for _ in self._scan_new_frames(timeout, scans_per_second):
             result = list(self.find_all(needle, confidence, text_kwargs=text_kwargs, image_kwargs=image_kwargs))
-            scan_count += 1
             if len(result) > 0:
                 break
-
-            pyautogui.sleep(1 / scans_per_second)
-
         return result
 
     def wait_until_image_appears(
@@ -522,15 +1378,10 @@ class BaseImage:
         :param image_kwargs: Additional arguments to pass along to the `find_image_all` method.
         :return: True if the needle vanished, False if the method timed out.
         """
-        scan_count = 0 if timeout * scans_per_second > 0 else -1  # We want the loop to occur at least once
-        while scan_count < timeout * scans_per_second:
+        for _ in self._scan_new_frames(timeout, scans_per_second):
             result = list(self.find_all(needle, confidence, text_kwargs=text_kwargs, image_kwargs=image_kwargs))
-            scan_count += 1
             if len(result) == 0:
                 return True
-
-            pyautogui.sleep(1 / scans_per_second)
-
         return False
 
     def wait_until_image_vanishes(
@@ -650,13 +1501,38 @@ class Image(BaseImage):
         super().__init__()
         self._original_image = image
         self.__numpy_image: Optional[np.ndarray] = None
+        self.__mask: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[np.ndarray]:
+        """
+        Decode an image file with OpenCV, returning its RGB (or RGBA, if it has an alpha channel) pixels, or ``None`` if
+        OpenCV can't read it.
+        """
+        decoded = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if decoded is None or decoded.dtype != np.uint8 or (decoded.ndim == 3 and decoded.shape[2] not in (3, 4)):
+            # Let OpenCV convert anything unusual (e.g. 16-bit images) to 8-bit color, dropping any alpha channel
+            decoded = cv2.imread(path, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+            if decoded is None:
+                return None
+
+        if decoded.ndim == 2:
+            return cv2.cvtColor(decoded, cv2.COLOR_GRAY2RGB)
+        if decoded.shape[2] == 4:
+            return cv2.cvtColor(decoded, cv2.COLOR_BGRA2RGBA, dst=decoded)
+        return cv2.cvtColor(decoded, cv2.COLOR_BGR2RGB, dst=decoded)
 
     def _get_numpy_image(self) -> np.ndarray:
         if self.__numpy_image is None:
             image = self._original_image
 
             if isinstance(image, (str, Path)):
-                image = PILImage.open(str(self._original_image))
+                # OpenCV decodes straight into a numpy array, whereas PIL decodes into its own buffer, which
+                # ``np.asarray`` then copies.  PIL is still used for anything OpenCV can't read.  Recently decoded files
+                # are reused (see ``_read_file_cached``).
+                stat = os.stat(image)
+                decoded = _read_file_cached(os.path.abspath(image), stat.st_mtime_ns, stat.st_size)
+                image = PILImage.open(str(self._original_image)) if decoded is None else decoded
 
             if isinstance(image, PILImage.Image):
                 image = np.asarray(image)
@@ -664,14 +1540,32 @@ class Image(BaseImage):
             if isinstance(image, np.ndarray):
                 if image.shape[2] == 4:
                     # Remove alpha channel.  This is necessary for `find_image_all`, where color dimension needs to
-                    # match between the two images (and the datatype, e.g. uint8 vs float, but for now this isn't
-                    # checked/corrected).
-                    image = image[:, :, :3]
-                self.__numpy_image = image
+                    # match between the two images (the datatype is reconciled when searching).  Instead, pixels that
+                    # aren't fully opaque are masked out when searching for the image.
+                    alpha = image[:, :, 3]
+                    if image.dtype == np.uint8:
+                        # OpenCV drops the alpha channel many times faster than numpy copies the strided color channels
+                        image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
+                    else:
+                        image = image[:, :, :3]
+                    if _fits_in_uint8(alpha):
+                        opaque = alpha == 255
+                        if not opaque.all():
+                            self.__mask = opaque.view(np.uint8)
+                if image.dtype != np.uint8 and _fits_in_uint8(image):
+                    # Searching converts the images to ``uint8`` (OpenCV's fastest path) whenever their values fit, so
+                    # convert it once here instead of every search
+                    image = image.astype(np.uint8)
+                # OpenCV copies a non-contiguous array (e.g. sliced channels) on every call, so copy it once here
+                self.__numpy_image = np.ascontiguousarray(image)
             else:
                 raise TypeError(f"Unrecognized type for image: {self._original_image!r}")
         return self.__numpy_image
 
+    def _get_mask(self) -> Optional[np.ndarray]:
+        self._get_numpy_image()
+        return self.__mask
+
     def _get_pil_image(self) -> PILImage.Image:
         if isinstance(self._original_image, PILImage.Image):
             return self._original_image
@@ -693,6 +1587,17 @@ class RegionInImage(BaseImage):
         super().__init__()
         self._parent_image = parent_image
         self._region = region
+        self.__numpy_image: Optional[np.ndarray] = None
+
+        # Resolve the root image now, so it doesn't require walking up the parents each time.  The region within the
+        # root image is only resolved when first needed (from the parent's), since searching can create thousands of
+        # matched regions that are never moved or cropped.
+        if isinstance(parent_image, RegionInImage):
+            self._root_image = parent_image.root_image
+            self._absolute_region: Optional[Region] = None
+        else:
+            self._root_image = parent_image
+            self._absolute_region = region
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(parent_image={self.parent_image!r}, region={self.region!r})"
@@ -704,10 +1609,11 @@ class RegionInImage(BaseImage):
         if not isinstance(other, RegionInImage):
             return NotImplemented
 
+        # The regions are compared first, since comparing the parents may compare their pixels
         return (
             isinstance(other, RegionInImage)
-            and self._parent_image == other._parent_image
             and self._region == other._region
+            and self._parent_image == other._parent_image
         )
 
     @property
@@ -724,40 +1630,78 @@ class RegionInImage(BaseImage):
         """
         return self._region
 
+    @property
+    def _is_dynamic(self) -> bool:  # type: ignore[override]
+        return self._parent_image._is_dynamic
+
+    @property
+    def width(self) -> int:
+        """
+        Width of the image.  This is the region's width, so the pixels don't need to be retrieved.
+        """
+        return self._region.width
+
+    @property
+    def height(self) -> int:
+        """
+        Height of the image.  This is the region's height, so the pixels don't need to be retrieved.
+        """
+        return self._region.height
+
+    def _single_frame(self):
+        return self._root_image._single_frame()
+
+    def _get_shape(self) -> Tuple[int, ...]:
+        # The region's size, so getting a child region doesn't need to retrieve (and copy) this region's pixels
+        return self._region.height, self._region.width
+
     @property
     def root_image(self) -> BaseImage:
         """
         The base image, which may be the parent image but could be a further ancestor.  Basically, the first
         non-``RegionInImage`` ancestor.
         """
-        if isinstance(self._parent_image, RegionInImage):
-            return self._parent_image.root_image
-        return self._parent_image
+        return self._root_image
 
     @property
     def absolute_region(self) -> Region:
         """
         The region in the root image, which may be the parent image but could be a further ancestor.
         """
-        if isinstance(self._parent_image, RegionInImage):
-            parent_absolute_region = self._parent_image.absolute_region
-            return Region(
-                parent_absolute_region.x + self.region.x,
-                parent_absolute_region.y + self.region.y,
-                self.region.width,
-                self.region.height,
+        if self._absolute_region is None:
+            parent_absolute_region = self._parent_image.absolute_region  # type: ignore[attr-defined]
+            self._absolute_region = Region(
+                parent_absolute_region.x + self._region.x,
+                parent_absolute_region.y + self._region.y,
+                self._region.width,
+                self._region.height,
             )
-
-        return self.region
+        return self._absolute_region
 
     def _get_numpy_image(self) -> np.ndarray:
+        if self.__numpy_image is not None:
+            return self.__numpy_image
+
         x_min = self._region.left
         x_max = self._region.right
 
         y_min = self._region.top
         y_max = self._region.bottom
 
-        return self._parent_image._get_numpy_image()[y_min:y_max, x_min:x_max, :]
+        image = self._parent_image._get_numpy_image()[y_min:y_max, x_min:x_max, :]
+        if not self._is_dynamic:
+            # A slice of the parent is usually not contiguous, which makes OpenCV copy it on every call, so copy it once
+            # here instead.
+            image = np.ascontiguousarray(image)
+            self.__numpy_image = image
+        return image
+
+    def _get_mask(self) -> Optional[np.ndarray]:
+        mask = self._parent_image._get_mask()
+        if mask is None:
+            return None
+        mask = mask[self._region.top : self._region.bottom, self._region.left : self._region.right]
+        return np.ascontiguousarray(mask) if not mask.all() else None
 
     def raw_region_left(self, size: Optional[int] = None, absolute=True) -> Region:
         """
@@ -1014,7 +1958,7 @@ class RegionInImage(BaseImage):
         Get the top left point of the region relative to the parent image (if absolute=False) or the root image (if
         absolute=True, default).
         """
-        return Point(self.get_left(absolute), self.get_top(absolute))
+        return (self.absolute_region if absolute else self.region).min_point
 
     @property
     def min_point(self) -> Point:
@@ -1031,7 +1975,7 @@ class RegionInImage(BaseImage):
         Get the top right point of the region relative to the parent image (if absolute=False) or the root image (if
         absolute=True, default).
         """
-        return Point(self.get_right(absolute), self.get_top(absolute))
+        return (self.absolute_region if absolute else self.region).top_right
 
     @property
     def top_right(self) -> Point:
@@ -1042,7 +1986,7 @@ class RegionInImage(BaseImage):
         Get the bottom left point of the region relative to the parent image (if absolute=False) or the root image (if
         absolute=True, default).
         """
-        return Point(self.get_left(absolute), self.get_bottom(absolute))
+        return (self.absolute_region if absolute else self.region).bottom_left
 
     @property
     def bottom_left(self) -> Point:
@@ -1053,7 +1997,7 @@ class RegionInImage(BaseImage):
         Get the bottom right point of the region relative to the parent image (if absolute=False) or the root image (if
         absolute=True, default).
         """
-        return Point(self.get_right(absolute), self.get_bottom(absolute))
+        return (self.absolute_region if absolute else self.region).max_point
 
     @property
     def max_point(self) -> Point:
@@ -1070,10 +2014,7 @@ class RegionInImage(BaseImage):
         Get the center point of the region relative to the parent image (if absolute=False) or the root image (if
         absolute=True, default).
         """
-        return Point(
-            (self.get_right(absolute) + self.get_left(absolute)) // 2,
-            (self.get_bottom(absolute) + self.get_top(absolute)) // 2,
-        )
+        return (self.absolute_region if absolute else self.region).center
 
     @property
     def center(self) -> Point:
@@ -1135,21 +2076,71 @@ class MatchedRegionInImage(RegionInImage):
 
         return (
             isinstance(other, MatchedRegionInImage)
+            and self._confidence == other._confidence
             and super().__eq__(other)
             and self._needle == other._needle
-            and self._confidence == other._confidence
         )
 
 
 class Screen(BaseImage):
-    def _get_ocr_matcher(self, language, line_break, paragraph_break):
-        return self._create_ocr_matcher(language, line_break, paragraph_break)
+    _is_dynamic = True
+
+    def __init__(self):
+        super().__init__()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_holders = 0
+        self._screen_grabber = None
 
     def _get_pil_image(self):
-        return pyautogui.screenshot()
+        if mss is None:
+            return pyautogui.screenshot()
+        return super()._get_pil_image()
+
+    def _take_screenshot(self) -> np.ndarray:
+        if mss is None:
+            return np.asarray(self._get_pil_image())
+
+        # mss copies the screen straight into a buffer, skipping the PIL image that pyautogui creates
+        if self._screen_grabber is None:
+            self._screen_grabber = mss.mss()
+        # Grab the same area that pyautogui does (e.g. every monitor on X11), so matches are at the coordinates that
+        # pyautogui moves the mouse to
+        width, height = pyautogui.size()
+        screenshot = self._screen_grabber.grab({"left": 0, "top": 0, "width": width, "height": height})
+        bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
 
     def _get_numpy_image(self):
-        return np.asarray(self._get_pil_image())
+        if self._frame is not None:
+            return self._frame
+
+        image = self._take_screenshot()
+        if self._frame_holders > 0:
+            self._frame = image
+        return image
+
+    def refresh(self) -> None:
+        """
+        Discard the held screenshot (if there is one), so the next access of the screen takes a new screenshot.
+        """
+        self._frame = None
+
+    @contextmanager
+    def frozen_frame(self):
+        """
+        Within the context, every access of the screen reuses the same screenshot instead of taking a new one.  Use
+        ``refresh`` to replace the held screenshot with a new one.
+        """
+        self._frame_holders += 1
+        try:
+            yield self
+        finally:
+            self._frame_holders -= 1
+            if self._frame_holders == 0:
+                self._frame = None
+
+    def _single_frame(self):
+        return self.frozen_frame()
 
     def save(self, location) -> None:
         self._get_pil_image().save(location)
@@ -5,9 +5,16 @@ from typing import Literal, Tuple, Union
 
 @dataclass(frozen=True)
 class Point:
+    # Many of these are created when searching images, so use slots (``dataclass(slots=True)`` needs Python 3.10)
+    __slots__ = ("x", "y")
+
     x: int
     y: int
 
+    def __reduce__(self):
+        # Frozen dataclasses with slots can't be restored attribute-by-attribute, so copy/pickle through ``__init__``
+        return self.__class__, (self.x, self.y)
+
     @classmethod
     def from_tuple(cls, location: Tuple[int, int]) -> "Point":
         return cls(location[0], location[1])
@@ -18,11 +25,18 @@ class Point:
 
 @dataclass(frozen=True)
 class Region:
+    # Many of these are created when searching images, so use slots (``dataclass(slots=True)`` needs Python 3.10)
+    __slots__ = ("x", "y", "width", "height")
+
     x: int
     y: int
     width: int
     height: int
 
+    def __reduce__(self):
+        # Frozen dataclasses with slots can't be restored attribute-by-attribute, so copy/pickle through ``__init__``
+        return self.__class__, (self.x, self.y, self.width, self.height)
+
     @classmethod
     def from_coordinates(cls, left, top, right, bottom):
         return cls(left, top, right - left, bottom - top)
@@ -59,29 +73,42 @@ class Region:
 
     @property
     def top_right(self) -> Point:
-        return Point(self.right, self.top)
+        return Point(self.x + self.width, self.y)
 
     @property
     def bottom_left(self) -> Point:
-        return Point(self.left, self.bottom)
+        return Point(self.x, self.y + self.height)
 
     @property
     def max_point(self) -> Point:
-        return Point(self.right, self.bottom)
+        return Point(self.x + self.width, self.y + self.height)
 
     bottom_right = max_point
 
     @property
     def center(self) -> Point:
-        return Point((self.right + self.left) // 2, (self.bottom + self.top) // 2)
+        # Equal to ``((right + left) // 2, (bottom + top) // 2)``, without going through the properties
+        return Point(self.x + self.width // 2, self.y + self.height // 2)
 
     def contains(self, item: "LocationType", overlap: Literal["all", "any"] = "all") -> bool:
+        # The fields are compared directly (rather than through ``left``, ``right``, ``min_point``, etc.), since this is
+        # called for every match when filtering them by location
+        right = self.x + self.width
+        bottom = self.y + self.height
         if isinstance(item, Point):
-            return (self.left <= item.x <= self.right) and (self.top <= item.y <= self.bottom)
+            return (self.x <= item.x <= right) and (self.y <= item.y <= bottom)
         if isinstance(item, Region):
             overlap = overlap.lower()  # type: ignore
             if overlap == "all":
-                return item.min_point in self and item.max_point in self
+                # Equal to ``item.min_point in self and item.max_point in self``
+                item_right = item.x + item.width
+                item_bottom = item.y + item.height
+                return (
+                    self.x <= item.x <= right
+                    and self.x <= item_right <= right
+                    and self.y <= item.y <= bottom
+                    and self.y <= item_bottom <= bottom
+                )
             if overlap == "any":
                 return (
                     self.bottom >= item.top
@@ -1,6 +1,8 @@
+import copy
 import re
+from bisect import bisect_right
 from collections import namedtuple
-from typing import List, Optional, Tuple
+from typing import List, Optional, Pattern, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -10,6 +12,8 @@ from pin_the_tail.location import Region
 
 OCRMatch = namedtuple("OCRMatch", ["index_start", "index_end", "region", "confidence"])
 
+NeedleText = Union[str, Pattern[str]]
+
 
 class OCRMatcher:
     def __init__(
@@ -40,81 +44,96 @@ class OCRMatcher:
         return self._df
 
     def process(self, line_break="\n", paragraph_break="\n\n"):
-        final_string = ""
-        index_mapping = []
-        for _, paragraph in self._get_raw_ocr().groupby(["page_num", "block_num", "par_num"]):
-            if len(final_string) > 0:
-                previous_region = index_mapping[-1].region
-                index_mapping.append(
-                    OCRMatch(
-                        len(final_string),
-                        len(final_string) + len(paragraph_break),
-                        Region.from_coordinates(
-                            previous_region.right,
-                            previous_region.top,
-                            paragraph.iloc[0]["left"],
-                            previous_region.bottom,
-                        ),
-                        None,
-                    )
+        df = self._get_raw_ocr()
+        # Visit the words paragraph by paragraph and line by line, in the same order as grouping by those columns would
+        # (the sort is stable, so words keep their order within a line).  The columns are read as lists, since indexing
+        # the data frame row by row is much slower.
+        order = np.lexsort([df[column].to_numpy() for column in ("line_num", "par_num", "block_num", "page_num")])
+        rows = df.iloc[order]
+        columns = ["page_num", "block_num", "par_num", "line_num", "left", "top", "width", "height", "conf", "text"]
+        # A paragraph break ends where the paragraph's first word (in Tesseract's order, which may not be on its first
+        # line) starts
+        first_words = df.drop_duplicates(["page_num", "block_num", "par_num"])
+        paragraph_lefts = dict(
+            zip(
+                zip(*(first_words[column].tolist() for column in ("page_num", "block_num", "par_num"))),
+                first_words["left"].tolist(),
+            )
+        )
+
+        # The text is gathered in pieces and joined at the end, with ``length`` tracking how long it is so far
+        text_pieces = []  # type: List[str]
+        length = 0
+        index_mapping = []  # type: List[OCRMatch]
+
+        def add_separator(separator: str, next_left) -> None:
+            nonlocal length
+            previous_region = index_mapping[-1].region
+            index_mapping.append(
+                OCRMatch(
+                    length,
+                    length + len(separator),
+                    Region.from_coordinates(
+                        previous_region.right, previous_region.top, next_left, previous_region.bottom
+                    ),
+                    None,
                 )
-                final_string += paragraph_break
-
-            new_paragraph = True
-            for _, line in paragraph.groupby("line_num"):
-                if len(final_string) > 0 and not new_paragraph:
-                    previous_region = index_mapping[-1].region
-                    index_mapping.append(
-                        OCRMatch(
-                            len(final_string),
-                            len(final_string) + len(line_break),
-                            Region.from_coordinates(
-                                previous_region.right, previous_region.top, line.iloc[0]["left"], previous_region.bottom
-                            ),
-                            None,
-                        )
-                    )
-                    final_string += line_break
-
-                new_paragraph = False
-
+            )
+            text_pieces.append(separator)
+            length += len(separator)
+
+        previous_paragraph = None
+        previous_line = None
+        new_line = True
+        for page, block, paragraph, line, left, top, width, height, conf, text in zip(
+            *(rows[column].tolist() for column in columns)
+        ):
+            if (page, block, paragraph) != previous_paragraph:
+                previous_paragraph = (page, block, paragraph)
+                previous_line = line
                 new_line = True
-                for _, row in line.iterrows():
-                    if row["text"] == "":
-                        continue
-                    if len(final_string) > 0 and not new_line:
-                        previous_region = index_mapping[-1].region
-                        index_mapping.append(
-                            OCRMatch(
-                                len(final_string),
-                                len(final_string) + 1,
-                                Region.from_coordinates(
-                                    previous_region.right, previous_region.top, row["left"], previous_region.bottom
-                                ),
-                                None,
-                            )
-                        )
-                        final_string += " "
-                    index_mapping.append(
-                        OCRMatch(
-                            len(final_string),
-                            len(final_string) + len(row["text"]),
-                            Region(row["left"], row["top"], row["width"], row["height"]),
-                            row["conf"] / 100,
-                        )
-                    )
-                    final_string += row["text"]
-                    new_line = False
-
-        self._parsed_text = final_string
+                if length > 0:
+                    add_separator(paragraph_break, paragraph_lefts[previous_paragraph])
+            elif line != previous_line:
+                previous_line = line
+                new_line = True
+                if length > 0:
+                    add_separator(line_break, left)
+
+            if text == "":
+                continue
+            if length > 0 and not new_line:
+                add_separator(" ", left)
+            index_mapping.append(OCRMatch(length, length + len(text), Region(left, top, width, height), conf / 100))
+            text_pieces.append(text)
+            length += len(text)
+            new_line = False
+
+        self._parsed_text = "".join(text_pieces)
         self._ocr_segments = index_mapping
+        # The segments are in order and don't overlap, so the segment containing an index can be found by bisecting
+        self._segment_starts = [segment.index_start for segment in index_mapping]
+
+    def with_breaks(self, line_break="\n", paragraph_break="\n\n") -> "OCRMatcher":
+        """
+        A matcher for the same OCR results, but with the lines and paragraphs joined by ``line_break`` and
+        ``paragraph_break``.  Tesseract isn't run again.
+        """
+        matcher = copy.copy(self)
+        matcher.process(line_break, paragraph_break)
+        return matcher
 
     @property
     def text(self) -> str:
         return self._parsed_text
 
     def find_bounding_boxes(
-        self, needle: str, start: Optional[int] = None, end: Optional[int] = None, regex: bool = False, regex_flags=0
+        self,
+        needle: NeedleText,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        regex: bool = False,
+        regex_flags=0,
     ) -> Tuple[int, int, List[OCRMatch]]:
         """
         Find needle within the parsed string, returning the start and end indices and the bounding boxes
@@ -124,48 +143,67 @@ class OCRMatcher:
         start and end of the needle within the string, but the list of bounding boxes will be for the full tokens (e.g.
         the bounding box will be for "the", not just the "he" in it).  This may change in the future to be for just the
         matched part of a token.
+
+        ``needle`` may also be a compiled regular expression, in which case it's searched for as a regular expression
+        (regardless of ``regex``) and ``regex_flags`` is ignored in favor of the pattern's own flags.
         """
         no_match_found = -1, -1, []  # type: Tuple[int, int, List]
 
         start = start or 0
         end = end or len(self._parsed_text)
-        text_to_search = self._parsed_text[start:end]
+
+        if isinstance(needle, re.Pattern):
+            regex = True
+        elif regex:
+            needle = re.compile(needle, regex_flags)
 
         if regex:
-            match = re.search(needle, text_to_search, regex_flags)
+            # The text is sliced (rather than using the pattern's ``pos``/``endpos``) so that ``^`` matches at ``start``
+            match = needle.search(self._parsed_text[start:end])
             if match is None:
                 return no_match_found
             index_start, index_end = match.span()
+            index_start += start
+            index_end += start
         else:
-            index_start = text_to_search.find(needle)
+            index_start = self._parsed_text.find(needle, start, end)
             if index_start == -1:
                 return no_match_found
 
             index_end = index_start + len(needle)
 
-        index_start += start
-        index_end += start
+        i = bisect_right(self._segment_starts, index_start) - 1
+        if i < 0:
+            return no_match_found
+        token = self._ocr_segments[i]
+        if not token.index_start <= index_start < token.index_end:
+            return no_match_found
 
-        for i, token in enumerate(self._ocr_segments):
-            if token.index_start <= index_start < token.index_end:
-                tokens = []
-                if index_end <= token.index_end:
-                    tokens.append(token)
-                else:
-                    end_token_i = i
-                    while index_end >= token.index_end:
-                        tokens.append(token)
-                        end_token_i += 1
-                        token = self._ocr_segments[end_token_i]
+        tokens = []
+        if index_end <= token.index_end:
+            tokens.append(token)
+        else:
+            end_token_i = i
+            while index_end >= token.index_end:
+                tokens.append(token)
+                end_token_i += 1
+                token = self._ocr_segments[end_token_i]
 
-                return index_start, index_end, tokens
-        return no_match_found
+        return index_start, index_end, tokens
 
     def find_bounding_boxes_all(
-        self, needle: str, start: Optional[int] = None, end: Optional[int] = None, regex: bool = False, regex_flags=0
+        self,
+        needle: NeedleText,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        regex: bool = False,
+        regex_flags=0,
     ) -> List[Tuple[int, int, List[OCRMatch]]]:
         results = []
         start = start or 0
+        if regex and isinstance(needle, str):
+            # Compile once rather than on every search for the next occurrence
+            needle = re.compile(needle, regex_flags)
 
         found = self.find_bounding_boxes(needle, start, end, regex, regex_flags)
         while found[0] != -1:
@@ -176,7 +214,12 @@ class OCRMatcher:
         return results
 
     def find(
-        self, needle: str, start: Optional[int] = None, end: Optional[int] = None, regex: bool = False, regex_flags=0
+        self,
+        needle: NeedleText,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        regex: bool = False,
+        regex_flags=0,
     ) -> Optional[OCRMatch]:
         index_start, index_end, bounding_boxes = self.find_bounding_boxes(needle, start, end, regex, regex_flags)
 
@@ -197,7 +240,7 @@ class OCRMatcher:
 
     def find_all(
         self,
-        needle: str,
+        needle: NeedleText,
         start: Optional[int] = None,
         end: Optional[int] = None,
         regex: bool = False,
@@ -205,6 +248,9 @@ class OCRMatcher:
     ) -> List[OCRMatch]:
         results = []
         start = start or 0
+        if regex and isinstance(needle, str):
+            # Compile once rather than on every search for the next occurrence
+            needle = re.compile(needle, regex_flags)
 
         found = self.find(needle, start, end, regex, regex_flags)
         while found is not None:
@@ -1,14 +1,30 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from unittest import mock
 from unittest.mock import MagicMock, call
 
+import cv2
 import numpy as np
 import pyautogui
 import pytest
 from PIL import Image as PILImage
 from PIL import ImageChops
 
-from pin_the_tail.image import BaseImage, Image, MatchedRegionInImage, OutOfBoundsError, RegionInImage, Screen
+from pin_the_tail.image import (
+    OCR_FRAMES_REMEMBERED,
+    SCANNED_FRAMES_REMEMBERED,
+    BaseImage,
+    Image,
+    MatchedRegionInImage,
+    OutOfBoundsError,
+    RegionInImage,
+    Screen,
+    _arrays_equal,
+    _HaystackSpectrum,
+    _match_template,
+)
 from pin_the_tail.location import Point, Region
 from pin_the_tail.ocr import OCRMatch
 
@@ -31,6 +47,23 @@ def are_pil_images_equal(img1, img2):
     return equal_size and equal_alphas and equal_content
 
 
+@contextmanager
+def fake_clock():
+    """
+    Patches the clock used while waiting so that it only moves forward when sleeping (or when ``advance`` is called),
+    yielding ``(sleep_patch, advance)``.
+    """
+    now = [1000.0]
+
+    def advance(seconds):
+        now[0] += seconds
+
+    with mock.patch("pin_the_tail.image.time.monotonic", side_effect=lambda: now[0]), mock.patch(
+        "pin_the_tail.image.pyautogui.sleep", side_effect=advance
+    ) as sleep_patch:
+        yield sleep_patch, advance
+
+
 class TestBaseImage:
     @staticmethod
     def test_inverted_colors():
@@ -44,6 +77,24 @@ class TestBaseImage:
         any_image._get_numpy_image.assert_called_once()
         assert actual == expected
 
+    @staticmethod
+    def test_inverted_colors_keeps_transparent_pixels_transparent():
+        any_image = Image(np.array([[[1, 2, 3, 255], [4, 5, 6, 0]]], dtype=np.uint8))
+
+        actual = any_image.get_as_inverted_colors()
+
+        assert (actual._get_numpy_image() == [[[254, 253, 252], [251, 250, 249]]]).all()
+        assert (actual._get_mask() == [[1, 0]]).all()
+
+    @staticmethod
+    def test_inverted_colors_keeps_transparent_pixels_transparent_when_colors_dont_fit_in_uint8():
+        any_image = Image(np.array([[[1, 2, 300, 255], [4, 5, 6, 0]]], dtype=np.int64))
+
+        actual = any_image.get_as_inverted_colors()
+
+        assert (actual._get_numpy_image() == [[[254, 253, -45], [251, 250, 249]]]).all()
+        assert (actual._get_mask() == [[1, 0]]).all()
+
     @staticmethod
     def test_inverted_colors_with_alpha_channel():
         any_image = BaseImage()
@@ -88,8 +139,144 @@ class TestBaseImage:
 
         assert any_image.region == Region(0, 0, 3, 2)
 
+    @staticmethod
+    def test_image_is_equal_to_itself_without_comparing_pixels():
+        any_image = BaseImage()
+        any_image._get_numpy_image = MagicMock(return_value=np.zeros((300, 200, 3), dtype=np.uint8))
+
+        with mock.patch("pin_the_tail.image.cv2.norm") as norm:
+            assert any_image == any_image
+
+        norm.assert_not_called()
+
+    @staticmethod
+    def test_float_image_with_nan_is_not_equal_to_itself():
+        any_image = BaseImage()
+        any_image._get_numpy_image = MagicMock(return_value=np.full((3, 2, 3), np.nan))
+
+        assert any_image != any_image
+
 
 class TestImage:
+    @staticmethod
+    def test_loading_image_from_file_matches_pil():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+
+        expected = np.asarray(PILImage.open(RESOURCES_DIR / "wiki-python-text.png"))[:, :, :3]
+        assert (any_image._get_numpy_image() == expected).all()
+
+    @staticmethod
+    def test_loading_image_with_alpha_channel_from_file_drops_alpha(tmp_path):
+        rgba = np.array([[[1, 2, 3, 4], [5, 6, 7, 8]], [[9, 10, 11, 12], [13, 14, 15, 16]]], dtype=np.uint8)
+        PILImage.fromarray(rgba).save(tmp_path / "image.png")
+
+        any_image = Image(tmp_path / "image.png")
+
+        assert (any_image._get_numpy_image() == rgba[:, :, :3]).all()
+
+    @staticmethod
+    def test_image_with_alpha_channel_is_stored_without_alpha_once():
+        rgba = np.array([[[1, 2, 3, 4], [5, 6, 7, 8]], [[9, 10, 11, 12], [13, 14, 15, 16]]], dtype=np.uint8)
+
+        any_image = Image(rgba)
+        numpy_image = any_image._get_numpy_image()
+
+        assert (numpy_image == rgba[:, :, :3]).all()
+        assert numpy_image.flags["C_CONTIGUOUS"]
+        assert any_image._get_numpy_image() is numpy_image
+
+    @staticmethod
+    def test_integer_image_that_fits_in_uint8_is_stored_as_uint8():
+        any_image = Image(np.array([[[0, 1, 2], [253, 254, 255]]], dtype=np.int64))
+
+        assert any_image._get_numpy_image().dtype == np.uint8
+        assert (any_image._get_numpy_image() == [[[0, 1, 2], [253, 254, 255]]]).all()
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "any_numpy_image",
+        [np.array([[[0, 1, 2], [253, 254, 256]]]), np.array([[[0.0, 0.5, 1.0], [2.0, 3.0, 4.0]]])],
+    )
+    def test_image_that_does_not_fit_in_uint8_keeps_its_datatype(any_numpy_image):
+        any_image = Image(any_numpy_image)
+
+        assert any_image._get_numpy_image().dtype == any_numpy_image.dtype
+
+    @staticmethod
+    def test_image_with_transparent_pixels_masks_them():
+        rgba = np.array([[[1, 2, 3, 255], [5, 6, 7, 0]], [[9, 10, 11, 128], [13, 14, 15, 255]]], dtype=np.uint8)
+
+        any_image = Image(rgba)
+
+        assert (any_image._get_mask() == [[1, 0], [0, 1]]).all()
+
+    @staticmethod
+    def test_image_without_transparent_pixels_has_no_mask():
+        rgba = np.array([[[1, 2, 3, 255], [5, 6, 7, 255]]], dtype=np.uint8)
+
+        assert Image(rgba)._get_mask() is None
+        assert Image(rgba[:, :, :3])._get_mask() is None
+
+    @staticmethod
+    def test_loading_image_with_transparent_pixels_from_file_masks_them(tmp_path):
+        rgba = np.array([[[1, 2, 3, 255], [5, 6, 7, 0]], [[9, 10, 11, 255], [13, 14, 15, 255]]], dtype=np.uint8)
+        PILImage.fromarray(rgba).save(tmp_path / "image.png")
+
+        any_image = Image(tmp_path / "image.png")
+
+        assert (any_image._get_numpy_image() == rgba[:, :, :3]).all()
+        assert (any_image._get_mask() == [[1, 0], [1, 1]]).all()
+
+    @staticmethod
+    def test_loading_grayscale_image_from_file(tmp_path):
+        PILImage.new("L", (3, 2), 100).save(tmp_path / "image.png")
+
+        any_image = Image(tmp_path / "image.png")
+
+        assert any_image._get_numpy_image().shape == (2, 3, 3)
+        assert (any_image._get_numpy_image() == 100).all()
+
+    @staticmethod
+    def test_loading_the_same_file_twice_only_decodes_it_once(tmp_path):
+        PILImage.new("RGB", (3, 2), (10, 20, 30)).save(tmp_path / "image.png")
+
+        with mock.patch.object(Image, "_read_file", wraps=Image._read_file) as read_file:
+            first_image = Image(tmp_path / "image.png")._get_numpy_image()
+            second_image = Image(str(tmp_path / "image.png"))._get_numpy_image()
+
+        read_file.assert_called_once()
+        assert second_image is first_image
+        assert not first_image.flags.writeable
+
+    @staticmethod
+    def test_loading_a_file_again_after_it_changes_decodes_it_again(tmp_path):
+        PILImage.new("RGB", (3, 2), (10, 20, 30)).save(tmp_path / "image.png")
+        first_image = Image(tmp_path / "image.png")._get_numpy_image()
+
+        PILImage.new("RGB", (5, 4), (40, 50, 60)).save(tmp_path / "image.png")
+        second_image = Image(tmp_path / "image.png")._get_numpy_image()
+
+        assert first_image.shape == (2, 3, 3)
+        assert second_image.shape == (4, 5, 3)
+        assert (second_image == (40, 50, 60)).all()
+
+    @staticmethod
+    def test_loading_image_opencv_cannot_read_falls_back_to_pil(tmp_path):
+        PILImage.new("RGB", (3, 2), (10, 20, 30)).save(tmp_path / "image.pcx")
+
+        any_image = Image(tmp_path / "image.pcx")
+
+        assert any_image._get_numpy_image().shape[:2] == (2, 3)
+
+    @staticmethod
+    def test_child_image_masks_transparent_pixels_of_parent():
+        rgba = np.full((4, 5, 4), 255, dtype=np.uint8)
+        rgba[1, 2, 3] = 0
+        any_image = Image(rgba)
+
+        assert (any_image.get_child_region(Region(1, 1, 2, 2))._get_mask() == [[1, 0], [1, 1]]).all()
+        assert any_image.get_child_region(Region(3, 0, 2, 4))._get_mask() is None
+
     @staticmethod
     def test_getting_child_image():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -102,6 +289,14 @@ class TestImage:
 
         assert (expected_child_image == actual_child_image).all()
 
+    @staticmethod
+    def test_getting_child_image_covering_entire_image():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+
+        child_image = any_image.get_child_region(any_image.region)
+
+        assert (any_image._get_numpy_image() == child_image._get_numpy_image()).all()
+
     @staticmethod
     def test_getting_child_image_where_left_is_negative_raises_out_of_bounds_error():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -174,6 +369,19 @@ class TestImage:
             ]
         )
 
+    @staticmethod
+    def test_getting_ocr_matcher_for_same_language_with_different_breaks_reuses_the_ocr():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        mock_ocr_matcher = MagicMock()
+        any_image._create_ocr_matcher = MagicMock(return_value=mock_ocr_matcher)
+
+        any_image._get_ocr_matcher("eng", "\n", "\n\n")
+        matcher = any_image._get_ocr_matcher("eng", " ", " ")
+
+        any_image._create_ocr_matcher.assert_called_once_with("eng", "\n", "\n\n")
+        mock_ocr_matcher.with_breaks.assert_called_once_with(" ", " ")
+        assert matcher is mock_ocr_matcher.with_breaks.return_value
+
     @staticmethod
     def test_finding_all_instances_of_an_image():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -192,6 +400,254 @@ class TestImage:
         assert all(f.confidence >= 0.99 for f in found)
         assert expected == {image.region for image in found}
 
+    @staticmethod
+    @pytest.mark.parametrize("dtype", [np.int64, np.float64])
+    def test_finding_all_instances_of_an_image_with_non_uint8_arrays(dtype):
+        any_image = Image(np.asarray(PILImage.open(RESOURCES_DIR / "wiki-python-text.png"))[:, :, :3].astype(dtype))
+        needle = Image(np.asarray(PILImage.open(RESOURCES_DIR / "the.png"))[:, :, :3].astype(dtype))
+
+        found = any_image.find_image_all(needle)
+
+        expected = {
+            Region(x=1046, y=142, width=30, height=19),
+            Region(x=427, y=293, width=30, height=19),
+            Region(x=704, y=293, width=30, height=19),
+            Region(x=329, y=409, width=30, height=19),
+        }
+        assert expected == {image.region for image in found}
+
+    @staticmethod
+    def test_finding_all_instances_of_an_image_that_is_not_there_returns_empty_list():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png").get_as_inverted_colors()
+
+        assert any_image.find_image_all(needle) == []
+
+    @staticmethod
+    @pytest.mark.parametrize("kwargs", [{}, {"pyramid_levels": 1}])
+    def test_finding_all_instances_of_images_skips_needles_larger_than_the_image(kwargs):
+        any_image = Image(RESOURCES_DIR / "the.png")
+        too_tall = Image(np.zeros((any_image.height + 1, 5, 3), dtype=np.uint8))
+        too_large = Image(RESOURCES_DIR / "wiki-python-text.png")
+
+        found = any_image.find_image_all([too_tall, too_large, any_image], **kwargs)
+
+        assert [(match.region, match.needle) for match in found] == [(Region(0, 0, 30, 19), any_image)]
+
+    @staticmethod
+    def test_finding_all_instances_of_an_image_suppresses_overlapping_matches():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png")
+
+        all_found = any_image.find_image_all(needle, 0.93, suppress_overlapping=False)
+        found = any_image.find_image_all(needle, 0.93)
+
+        expected = {
+            Region(x=1046, y=142, width=30, height=19),
+            Region(x=427, y=293, width=30, height=19),
+            Region(x=704, y=293, width=30, height=19),
+            Region(x=329, y=409, width=30, height=19),
+        }
+        found_regions = {image.region for image in found}
+        assert expected <= found_regions
+        assert found_regions < {image.region for image in all_found}
+
+    @staticmethod
+    def test_finding_all_instances_of_several_images_using_a_shared_spectrum():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needles = [
+            Image(RESOURCES_DIR / "the.png"),
+            any_image.get_child_region(Region(300, 280, 200, 60)),
+            Image(RESOURCES_DIR / "the.png").get_as_inverted_colors(),
+        ]
+
+        found = any_image.find_image_all(needles, grayscale=False, shared_spectrum=True)
+
+        expected = {
+            Region(x=1046, y=142, width=30, height=19),
+            Region(x=427, y=293, width=30, height=19),
+            Region(x=704, y=293, width=30, height=19),
+            Region(x=329, y=409, width=30, height=19),
+            Region(x=300, y=280, width=200, height=60),
+        }
+        assert expected == {image.region for image in found}
+
+    @staticmethod
+    @pytest.mark.parametrize("shared_spectrum", [False, True])
+    def test_finding_all_instances_of_several_images_in_parallel(shared_spectrum):
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle1 = Image(RESOURCES_DIR / "the.png")
+        needle2 = any_image.get_child_region(Region(300, 280, 200, 60))
+        needle3 = Image(RESOURCES_DIR / "the.png").get_as_inverted_colors()
+
+        with mock.patch("pin_the_tail.image._available_threads", return_value=4), mock.patch(
+            "pin_the_tail.image._thread_pool", None
+        ), mock.patch("pin_the_tail.image.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as thread_pool:
+            any_image.find_image_all([needle1, needle3], grayscale=False, shared_spectrum=shared_spectrum)
+            found = any_image.find_image_all(
+                [needle1, needle2, needle3], grayscale=False, shared_spectrum=shared_spectrum
+            )
+            thread_pool.return_value.shutdown()
+
+        thread_pool.assert_called_once_with(max_workers=4, thread_name_prefix="pin_the_tail")
+        assert len(found) == 5
+        assert {image.region for image in found if image.needle is needle1} == {
+            Region(x=1046, y=142, width=30, height=19),
+            Region(x=427, y=293, width=30, height=19),
+            Region(x=704, y=293, width=30, height=19),
+            Region(x=329, y=409, width=30, height=19),
+        }
+        assert [image.region for image in found if image.needle is needle2] == [
+            Region(x=300, y=280, width=200, height=60)
+        ]
+
+    @staticmethod
+    def test_haystack_spectrum_is_only_computed_once():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png")
+
+        any_image.find_image_all(needle, grayscale=False, shared_spectrum=True)
+        spectrum = any_image._haystack_spectra[False]
+        any_image.find_image_all(needle, grayscale=False, shared_spectrum=True)
+
+        assert any_image._haystack_spectra == {False: spectrum}
+
+    @staticmethod
+    def test_grayscale_search_does_not_use_shared_spectrum():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png")
+
+        found = any_image.find_image_all(needle, shared_spectrum=True)
+
+        assert any_image._haystack_spectra == {}
+        assert len(found) == 4
+
+    @staticmethod
+    def test_finding_all_instances_of_an_image_suppresses_overlapping_matches_near_edges():
+        wiki_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        any_image = Image(wiki_image._get_numpy_image()[280:, 300:])
+        needle = wiki_image.get_child_region(Region(300, 280, 200, 60))
+
+        found = any_image.find_image_all(needle, 0.9)
+
+        regions = [image.region for image in found]
+        assert Region(0, 0, 200, 60) in regions
+        assert all(region.x >= 100 or region.y >= 30 for region in regions if region != Region(0, 0, 200, 60))
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "kwargs", [{}, {"grayscale": False}, {"grayscale": False, "shared_spectrum": True}, {"pyramid_levels": 2}]
+    )
+    def test_finding_all_instances_of_an_image_ignores_transparent_pixels_of_needle(kwargs):
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        rgba = np.dstack((Image(RESOURCES_DIR / "the.png")._get_numpy_image(), np.full((19, 30), 255, dtype=np.uint8)))
+        rgba[:3] = np.random.default_rng(0).integers(0, 255, (3, 30, 4), dtype=np.uint8)
+        rgba[:3, :, 3] = 0
+
+        found = any_image.find_image_all(Image(rgba), 0.95, **kwargs)
+        found_opaque = any_image.find_image_all(Image(rgba[:, :, :3]), 0.95, **kwargs)
+
+        assert Region(x=1046, y=142, width=30, height=19) in [image.region for image in found]
+        assert found_opaque == []
+
+    @staticmethod
+    def test_finding_image_with_transparent_pixels_in_blank_image_finds_nothing():
+        any_image = Image(np.zeros((50, 60, 3), dtype=np.uint8))
+        rgba = np.random.default_rng(0).integers(1, 255, (10, 10, 4), dtype=np.uint8)
+        rgba[:, :, 3] = 255
+        rgba[0, 0, 3] = 0
+        needle = Image(rgba)
+
+        assert any_image.find_image_all(needle, 0.5, match_method=cv2.TM_CCORR_NORMED) == []
+        assert any_image.find_image(needle, 0.5, match_method=cv2.TM_CCORR_NORMED) is None
+
+    @staticmethod
+    def test_finding_all_instances_of_an_image_in_grayscale():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png")
+
+        found = any_image.find_image_all(needle, grayscale=True)
+
+        expected = {
+            Region(x=1046, y=142, width=30, height=19),
+            Region(x=427, y=293, width=30, height=19),
+            Region(x=704, y=293, width=30, height=19),
+            Region(x=329, y=409, width=30, height=19),
+        }
+        assert all(f.confidence >= 0.99 for f in found)
+        assert expected == {image.region for image in found}
+
+    @staticmethod
+    def test_finding_an_image_in_color_only_matches_the_same_colors():
+        haystack = np.zeros((50, 50, 3), dtype=np.uint8)
+        haystack[20:30, 20:30] = (0, 130, 0)
+        needle = np.zeros((14, 14, 3), dtype=np.uint8)
+        needle[2:12, 2:12] = (255, 0, 0)  # as bright as the green square once converted to grayscale
+        any_image, needle_image = Image(haystack), Image(needle)
+
+        assert [found.region for found in any_image.find_image_all(needle_image)] == [Region(18, 18, 14, 14)]
+        assert any_image.find_image_all(needle_image, grayscale=False) == []
+
+    @staticmethod
+    def test_finding_an_image_in_grayscale_in_a_single_channel_image():
+        haystack = np.zeros((50, 50, 1), dtype=np.uint8)
+        haystack[20:30, 20:30] = 200
+        needle = np.zeros((14, 14, 1), dtype=np.uint8)
+        needle[2:12, 2:12] = 200
+        any_image, needle_image = Image(haystack), Image(needle)
+
+        assert any_image._get_grayscale_numpy_image().shape == (50, 50)
+        assert [found.region for found in any_image.find_image_all(needle_image)] == [Region(18, 18, 14, 14)]
+
+    @staticmethod
+    def test_finding_an_image_in_grayscale_in_a_grayscale_image_with_alpha_channel():
+        haystack = np.zeros((50, 50, 2), dtype=np.uint8)
+        haystack[:, :, 1] = 255
+        haystack[20:30, 20:30, 0] = 200
+        needle = np.zeros((14, 14, 2), dtype=np.uint8)
+        needle[:, :, 1] = 255
+        needle[2:12, 2:12, 0] = 200
+        any_image = Image(PILImage.fromarray(haystack, mode="LA"))
+        needle_image = Image(PILImage.fromarray(needle, mode="LA"))
+
+        assert any_image._get_grayscale_numpy_image().shape == (50, 50)
+        assert [found.region for found in any_image.find_image_all(needle_image)] == [Region(18, 18, 14, 14)]
+
+    @staticmethod
+    def test_grayscale_image_is_only_computed_once():
+        any_image = Image(RESOURCES_DIR / "the.png")
+
+        grayscale_image = any_image._get_grayscale_numpy_image()
+
+        assert grayscale_image.shape == (19, 30)
+        assert any_image._get_grayscale_numpy_image() is grayscale_image
+
+    @staticmethod
+    @pytest.mark.parametrize("pyramid_levels", [1, 2, 3])
+    def test_finding_all_instances_of_an_image_using_a_pyramid(pyramid_levels):
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(any_image.get_child_region(Region(300, 280, 200, 60))._get_numpy_image())
+
+        found = any_image.find_image_all(needle, pyramid_levels=pyramid_levels)
+
+        assert [image.region for image in found] == [Region(300, 280, 200, 60)]
+        assert found[0].confidence == pytest.approx(1.0)
+
+    @staticmethod
+    def test_finding_all_instances_of_a_small_image_using_a_pyramid_searches_full_size_image():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png")
+
+        found = any_image.find_image_all(needle, pyramid_levels=2)
+
+        expected = {
+            Region(x=1046, y=142, width=30, height=19),
+            Region(x=427, y=293, width=30, height=19),
+            Region(x=704, y=293, width=30, height=19),
+            Region(x=329, y=409, width=30, height=19),
+        }
+        assert expected == {image.region for image in found}
+
     @staticmethod
     def test_finding_all_instances_of_text():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -206,7 +662,7 @@ class TestImage:
 
         found = list(
             any_image.find_text_all(
-                "text", 0.89, regex=True, regex_flags=13, language="eng", line_break="\n", paragraph_break="\n\n"
+                "text", 0.89, regex=True, regex_flags=10, language="eng", line_break="\n", paragraph_break="\n\n"
             )
         )
 
@@ -216,7 +672,7 @@ class TestImage:
         ]
 
         any_image._get_ocr_matcher.assert_called_once_with("eng", "\n", "\n\n")
-        mock_ocr_matcher.find_all.assert_called_once_with("text", regex=True, regex_flags=13)
+        mock_ocr_matcher.find_all.assert_called_once_with(re.compile("text", 10))
         assert found == expected
 
     @staticmethod
@@ -231,7 +687,7 @@ class TestImage:
                 "text",
                 0.89,
                 regex=True,
-                regex_flags=13,
+                regex_flags=10,
                 language="eng",
                 line_break="\n",
                 paragraph_break="\n\n",
@@ -241,9 +697,19 @@ class TestImage:
         expected = []
 
         any_image._get_ocr_matcher.assert_called_once_with("eng", "\n", "\n\n")
-        mock_ocr_matcher.find_all.assert_called_once_with("text", regex=True, regex_flags=13)
+        mock_ocr_matcher.find_all.assert_called_once_with(re.compile("text", 10))
         assert found == expected
 
+    @staticmethod
+    def test_finding_all_instances_of_no_text_does_not_run_ocr():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        any_image._get_ocr_matcher = MagicMock()
+
+        found = any_image.find_text_all([])
+
+        assert found == []
+        any_image._get_ocr_matcher.assert_not_called()
+
     @staticmethod
     def test_finding_best_match_image():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -254,6 +720,36 @@ class TestImage:
         assert found.parent_image == any_image
         assert found.region == Region(x=1046, y=142, width=30, height=19)
 
+    @staticmethod
+    @pytest.mark.parametrize("kwargs", [{}, {"grayscale": False}, {"pyramid_levels": 0}, {"pyramid_levels": 1}])
+    def test_finding_best_match_image_among_several_needles(kwargs):
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle1 = any_image.get_child_region(Region(300, 280, 200, 60)).get_as_inverted_colors()
+        needle2 = any_image.get_child_region(Region(300, 280, 200, 60))
+
+        found = any_image.find_image([needle1, needle2], **kwargs)
+
+        assert found.parent_image == any_image
+        assert found.region == Region(x=300, y=280, width=200, height=60)
+        assert found.needle is needle2
+
+    @staticmethod
+    @pytest.mark.parametrize("match_method", [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED, cv2.TM_CCORR_NORMED])
+    def test_finding_best_match_image_with_match_method(match_method):
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = any_image.get_child_region(Region(300, 280, 200, 60))
+
+        found = any_image.find_image(needle, 0, match_method=match_method)
+
+        assert found.region == Region(x=300, y=280, width=200, height=60)
+
+    @staticmethod
+    def test_finding_best_match_image_returns_none_when_not_found():
+        any_image = Image(RESOURCES_DIR / "the.png")
+        needle = any_image.get_as_inverted_colors()
+
+        assert any_image.find_image(needle) is None
+
     @staticmethod
     def test_finding_best_match_text():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -666,7 +1162,7 @@ class TestBaseImageWaitUntilAppears:
         needle1 = "text"
         needle2 = BaseImage()
 
-        with mock.patch("pin_the_tail.image.pyautogui.sleep", return_value=None, new_callable=MagicMock) as sleep_patch:
+        with fake_clock() as (sleep_patch, _):
             found = subject.wait_until_appears(
                 [needle1, needle2], 0.8, 10, scans_per_second=20, image_kwargs={"match_method": "ANY-METHOD"}
             )
@@ -676,8 +1172,8 @@ class TestBaseImageWaitUntilAppears:
             subject.find_text_all.assert_has_calls([call([needle1], 0.8)] * 200)
             assert subject.find_image_all.call_count == 200
             subject.find_image_all.assert_has_calls([call([needle2], 0.8, match_method="ANY-METHOD")] * 200)
-            assert sleep_patch.call_count == 200
-            sleep_patch.assert_has_calls([call(1 / 20)] * 200)
+            assert sleep_patch.call_count == 199
+            sleep_patch.assert_has_calls([call(pytest.approx(1 / 20))] * 199)
 
     @staticmethod
     def test_wait_until_appears_returns_found_region_when_needle_found_in_image_immediately():
@@ -715,6 +1211,33 @@ class TestBaseImageWaitUntilAppears:
             assert subject.find_all.call_count == 3
             assert sleep_patch.call_count == 2
 
+    @staticmethod
+    def test_wait_until_appears_only_sleeps_for_the_rest_of_the_scan_interval():
+        subject = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = "text"
+
+        with fake_clock() as (sleep_patch, advance):
+            subject.find_all = MagicMock(side_effect=lambda *args, **kwargs: advance(0.03) or [])
+            found = subject.wait_until_appears(needle, 0.8, 1, scans_per_second=10)
+
+            assert found == []
+            assert subject.find_all.call_count == 10
+            sleep_patch.assert_has_calls([call(pytest.approx(0.07))] * 9)
+            assert sleep_patch.call_count == 9
+
+    @staticmethod
+    def test_wait_until_appears_stops_at_timeout_when_scans_are_slow():
+        subject = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = "text"
+
+        with fake_clock() as (sleep_patch, advance):
+            subject.find_all = MagicMock(side_effect=lambda *args, **kwargs: advance(0.4) or [])
+            found = subject.wait_until_appears(needle, 0.8, 1, scans_per_second=10)
+
+            assert found == []
+            assert subject.find_all.call_count == 3
+            sleep_patch.assert_not_called()
+
     @staticmethod
     def test_wait_until_appears_scans_once_when_timeout_is_zero():
         subject = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -728,7 +1251,7 @@ class TestBaseImageWaitUntilAppears:
             assert found == []
             subject.find_all.assert_has_calls([call([needle1, needle2], 0.8, text_kwargs=None, image_kwargs=None)])
             assert subject.find_all.call_count == 1
-            sleep_patch.assert_called_once_with(1 / 20)
+            sleep_patch.assert_not_called()
 
 
 class TestBaseImageWaitUntilVanishes:
@@ -810,7 +1333,7 @@ class TestBaseImageWaitUntilVanishes:
         )
         subject.find_text_all = MagicMock(return_value=[])
 
-        with mock.patch("pin_the_tail.image.pyautogui.sleep", return_value=None, new_callable=MagicMock) as sleep_patch:
+        with fake_clock() as (sleep_patch, _):
             result = subject.wait_until_vanishes(
                 [needle1, needle2], 0.8, 10, scans_per_second=20, image_kwargs={"match_method": "ANY-METHOD"}
             )
@@ -820,8 +1343,8 @@ class TestBaseImageWaitUntilVanishes:
             subject.find_text_all.assert_has_calls([call([needle1], 0.8)] * 200)
             assert subject.find_image_all.call_count == 200
             subject.find_image_all.assert_has_calls([call([needle2], 0.8, match_method="ANY-METHOD")] * 200)
-            assert sleep_patch.call_count == 200
-            sleep_patch.assert_has_calls([call(1 / 20)] * 200)
+            assert sleep_patch.call_count == 199
+            sleep_patch.assert_has_calls([call(pytest.approx(1 / 20))] * 199)
 
     @staticmethod
     def test_wait_until_vanishes_returns_true_when_needle_eventually_leaves_image():
@@ -835,15 +1358,29 @@ class TestBaseImageWaitUntilVanishes:
             ]
         )
 
-        with mock.patch("pin_the_tail.image.pyautogui.sleep", return_value=None, new_callable=MagicMock) as sleep_patch:
+        with fake_clock() as (sleep_patch, _):
             vanished = any_image.wait_until_vanishes(needle, 0.8, 10, scans_per_second=20)
 
             assert vanished is True
             any_image.find_all.assert_has_calls([call(needle, 0.8, text_kwargs=None, image_kwargs=None)] * 3)
             assert any_image.find_all.call_count == 3
-            sleep_patch.assert_has_calls([call(1 / 20)] * 2)
+            sleep_patch.assert_has_calls([call(pytest.approx(1 / 20))] * 2)
             assert sleep_patch.call_count == 2
 
+    @staticmethod
+    def test_wait_until_vanishes_stops_at_timeout_when_scans_are_slow():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = "text"
+        match = MatchedRegionInImage(any_image, Region(0, 0, 1, 1), needle, 1.0)
+
+        with fake_clock() as (sleep_patch, advance):
+            any_image.find_all = MagicMock(side_effect=lambda *args, **kwargs: advance(0.4) or [match])
+            vanished = any_image.wait_until_vanishes(needle, 0.8, 1, scans_per_second=10)
+
+            assert vanished is False
+            assert any_image.find_all.call_count == 3
+            sleep_patch.assert_not_called()
+
     @staticmethod
     def test_wait_until_vanishes_scans_once_when_timeout_is_zero():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -856,7 +1393,7 @@ class TestBaseImageWaitUntilVanishes:
             assert vanished is False
             any_image.find_all.assert_has_calls([call(needle, 0.8, text_kwargs=None, image_kwargs=None)])
             assert any_image.find_all.call_count == 1
-            sleep_patch.assert_called_once_with(1 / 20)
+            sleep_patch.assert_not_called()
 
 
 class TestBaseImageContains:
@@ -952,6 +1489,28 @@ class TestChildImage:
 
         assert (expected_child_image == actual_child_image).all()
 
+    @staticmethod
+    def test_getting_grandchild_image_does_not_retrieve_child_pixels():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        child_image = any_image.get_child_region(Region(10, 30, 100, 400))
+        child_image._get_numpy_image = MagicMock(side_effect=child_image._get_numpy_image)
+
+        grandchild_image = child_image.get_child_region(Region(3, 5, 20, 100))
+        great_grandchild_image = grandchild_image.get_child_region(Region(1, 2, 5, 6))
+
+        child_image._get_numpy_image.assert_not_called()
+        assert great_grandchild_image.absolute_region == Region(14, 37, 5, 6)
+
+    @staticmethod
+    def test_getting_grandchild_image_outside_child_raises_error():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        child_image = any_image.get_child_region(Region(10, 30, 100, 400))
+
+        with pytest.raises(OutOfBoundsError):
+            child_image.get_child_region(Region(90, 5, 20, 100))
+        with pytest.raises(OutOfBoundsError):
+            child_image.get_child_region(Region(3, 350, 20, 100))
+
     @staticmethod
     def test_getting_region_for_grandchild():
         any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
@@ -974,6 +1533,17 @@ class TestChildImage:
 
         assert grandchild_image.absolute_region == Region(13, 35, 20, 100)
 
+    @staticmethod
+    def test_getting_root_image_and_absolute_region_for_great_grandchild():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        child_image = any_image.get_child_region(Region(10, 30, 100, 400))
+        grandchild_image = child_image.get_child_region(Region(3, 5, 20, 100))
+
+        great_grandchild_image = grandchild_image.get_child_region(Region(1, 2, 5, 6))
+
+        assert great_grandchild_image.root_image is any_image
+        assert great_grandchild_image.absolute_region == Region(14, 37, 5, 6)
+
     @staticmethod
     @pytest.mark.parametrize(
         "size,absolute,expected_region",
@@ -1304,7 +1874,7 @@ class TestChildImage:
         parent_image._get_numpy_image.assert_called_once_with()
 
     @staticmethod
-    def test_get_numpy_image_calls_parents_get_numpy_image_each_time():
+    def test_get_numpy_image_calls_parents_get_numpy_image_only_once():
         # Arrange
         parent_image = BaseImage()
         any_numpy_image = np.array([[[1, 2, 3], [4, 5, 6]], [[255, 254, 253], [252, 251, 250]]])
@@ -1319,6 +1889,35 @@ class TestChildImage:
         child_image._get_numpy_image()
         child_image._get_numpy_image()
 
+        # Assert
+        parent_image._get_numpy_image.assert_called_once_with()
+
+    @staticmethod
+    def test_get_numpy_image_is_c_contiguous():
+        any_image = Image(RESOURCES_DIR / "wiki-python-text.png")
+        child_image = any_image.get_child_region(Region(10, 30, 100, 400))
+
+        actual = child_image._get_numpy_image()
+
+        assert actual.flags["C_CONTIGUOUS"]
+        assert (actual == any_image._get_numpy_image()[30:430, 10:110, :]).all()
+
+    @staticmethod
+    def test_get_numpy_image_calls_parents_get_numpy_image_each_time_when_parent_is_dynamic():
+        # Arrange
+        parent_image = Screen()
+        any_numpy_image = np.array([[[1, 2, 3], [4, 5, 6]], [[255, 254, 253], [252, 251, 250]]])
+        parent_image._get_numpy_image = MagicMock(return_value=any_numpy_image)
+
+        child_region = Region(0, 0, 1, 1)
+        child_image = parent_image.get_child_region(child_region)
+        parent_image._get_numpy_image.reset_mock()
+
+        # Act
+        child_image._get_numpy_image()
+        child_image._get_numpy_image()
+        child_image._get_numpy_image()
+
         # Assert
         assert parent_image._get_numpy_image.call_count == 3
 
@@ -1424,6 +2023,17 @@ class TestRegionInImage:
         assert center == Point(7, 13)
         subject.get_center.assert_called_once_with()
 
+    @staticmethod
+    def test_regions_that_differ_are_not_equal_without_comparing_parents():
+        parent_image = BaseImage()
+        parent_image._get_numpy_image = MagicMock(return_value=np.zeros((100, 100, 3), dtype=np.uint8))
+        other_parent_image = BaseImage()
+        other_parent_image._get_numpy_image = MagicMock(return_value=np.zeros((100, 100, 3), dtype=np.uint8))
+
+        assert RegionInImage(parent_image, Region(1, 2, 3, 4)) != RegionInImage(other_parent_image, Region(1, 2, 3, 5))
+        parent_image._get_numpy_image.assert_not_called()
+        other_parent_image._get_numpy_image.assert_not_called()
+
 
 class TestMatchedRegionInImage:
     @staticmethod
@@ -1470,8 +2080,17 @@ class TestMatchedRegionInImage:
 
 class TestScreen:
     @staticmethod
-    def test_getting_ocr_matcher_for_same_language_creates_it_each_time():
+    @pytest.fixture(autouse=True)
+    def without_mss():
+        with mock.patch("pin_the_tail.image.mss", None):
+            yield
+
+    @staticmethod
+    def test_getting_ocr_matcher_for_same_language_creates_it_each_time_screen_changes():
         any_image = Screen()
+        pyautogui.screenshot = MagicMock(
+            side_effect=[PILImage.new("RGB", (100, 100)), PILImage.new("RGB", (100, 100), "white")]
+        )
         mock_ocr_matcher = MagicMock()
         any_image._create_ocr_matcher = MagicMock(return_value=mock_ocr_matcher)
 
@@ -1486,6 +2105,62 @@ class TestScreen:
             ]
         )
 
+    @staticmethod
+    def test_getting_ocr_matcher_for_same_language_only_creates_it_once_while_screen_is_unchanged():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(return_value=PILImage.new("RGB", (100, 100)))
+        mock_ocr_matcher = MagicMock()
+        any_image._create_ocr_matcher = MagicMock(return_value=mock_ocr_matcher)
+
+        first_matcher = any_image._get_ocr_matcher("eng", "\n", "\n\n")
+        second_matcher = any_image._get_ocr_matcher("eng", "\n", "\n\n")
+
+        any_image._create_ocr_matcher.assert_called_once_with("eng", "\n", "\n\n")
+        assert first_matcher is second_matcher is mock_ocr_matcher
+        assert pyautogui.screenshot.call_count == 2
+
+    @staticmethod
+    def test_getting_ocr_matcher_reuses_matcher_when_screen_changes_back():
+        any_image = Screen()
+        black_screen = PILImage.new("RGB", (100, 100))
+        white_screen = PILImage.new("RGB", (100, 100), "white")
+        pyautogui.screenshot = MagicMock(side_effect=[black_screen, white_screen, black_screen, white_screen])
+        any_image._create_ocr_matcher = MagicMock(side_effect=lambda *args: MagicMock())
+
+        matchers = [any_image._get_ocr_matcher("eng", "\n", "\n\n") for _ in range(4)]
+
+        assert any_image._create_ocr_matcher.call_count == 2
+        assert matchers[0] is matchers[2]
+        assert matchers[1] is matchers[3]
+        assert matchers[0] is not matchers[1]
+
+    @staticmethod
+    def test_getting_ocr_matcher_reads_screen_again_once_it_is_forgotten():
+        any_image = Screen()
+        screens = [PILImage.new("RGB", (100, 100), (value, value, value)) for value in range(OCR_FRAMES_REMEMBERED + 1)]
+        pyautogui.screenshot = MagicMock(side_effect=screens * 2)
+        any_image._create_ocr_matcher = MagicMock(side_effect=lambda *args: MagicMock())
+
+        for _ in range(2 * len(screens)):
+            any_image._get_ocr_matcher("eng", "\n", "\n\n")
+
+        assert any_image._create_ocr_matcher.call_count == 2 * len(screens)
+
+    @staticmethod
+    def test_getting_text_of_region_of_screen_reads_new_text_when_screen_changes():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(
+            side_effect=[PILImage.new("RGB", (100, 100)), PILImage.new("RGB", (100, 100), "white")]
+        )
+        child_image = RegionInImage(any_image, Region(10, 20, 30, 40))
+
+        with mock.patch("pin_the_tail.image.OCRMatcher") as ocr_matcher_class:
+            child_image.get_text()
+            child_image.get_text()
+
+        assert ocr_matcher_class.call_count == 2
+        assert pyautogui.screenshot.call_count == 2
+
     @staticmethod
     def test_getting_screenshot_takes_a_screenshot():
         any_image = Screen()
@@ -1497,6 +2172,50 @@ class TestScreen:
         pyautogui.screenshot.assert_called_once_with()
         assert (actual._get_numpy_image() == np.asarray(fake_screenshot)).all()
 
+    @staticmethod
+    def test_getting_child_region_takes_one_screenshot():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(return_value=PILImage.new("RGB", (100, 100)))
+
+        child_image = any_image.get_child_region(Region(10, 20, 30, 40))
+
+        pyautogui.screenshot.assert_called_once_with()
+        assert child_image.width == 30
+        assert child_image.height == 40
+        pyautogui.screenshot.assert_called_once_with()
+
+    @staticmethod
+    def test_getting_grandchild_region_does_not_take_another_screenshot():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(return_value=PILImage.new("RGB", (100, 100)))
+        child_image = any_image.get_child_region(Region(10, 20, 30, 40))
+
+        child_image.get_child_region(Region(5, 5, 10, 10)).get_child_region(Region(1, 1, 2, 2))
+
+        pyautogui.screenshot.assert_called_once_with()
+
+    @staticmethod
+    def test_finding_all_instances_of_an_image_takes_one_screenshot():
+        any_image = Screen()
+        haystack = Image(RESOURCES_DIR / "wiki-python-text.png")
+        pyautogui.screenshot = MagicMock(return_value=haystack._get_pil_image())
+
+        found = any_image.find_image_all(Image(RESOURCES_DIR / "the.png"))
+
+        pyautogui.screenshot.assert_called_once_with()
+        assert len(found) == 4
+        assert all(found_image.parent_image is any_image for found_image in found)
+
+    @staticmethod
+    def test_finding_all_instances_of_no_images_takes_no_screenshot():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(return_value=PILImage.new("RGB", (100, 100)))
+
+        found = any_image.find_image_all([])
+
+        assert found == []
+        pyautogui.screenshot.assert_not_called()
+
     @staticmethod
     def test_calling_screenshot_takes_a_new_screenshot_each_time():
         any_image = Screen()
@@ -1525,6 +2244,128 @@ class TestScreen:
         assert (first_screenshot == np.asarray(fake_screenshot1)).all()
         assert (second_screenshot == np.asarray(fake_screenshot2)).all()
 
+    @staticmethod
+    def test_getting_numpy_image_uses_mss_when_installed():
+        fake_screenshot = MagicMock(width=2, height=1, raw=bytes([1, 2, 3, 255, 4, 5, 6, 255]))
+        fake_mss = MagicMock()
+        fake_mss.mss.return_value.grab.return_value = fake_screenshot
+        pyautogui.screenshot = MagicMock()
+        pyautogui.size = MagicMock(return_value=(2, 1))
+
+        with mock.patch("pin_the_tail.image.mss", fake_mss):
+            any_image = Screen()
+            actual = any_image._get_numpy_image()
+            any_image._get_numpy_image()
+
+        fake_mss.mss.assert_called_once_with()
+        fake_mss.mss.return_value.grab.assert_called_with({"left": 0, "top": 0, "width": 2, "height": 1})
+        pyautogui.screenshot.assert_not_called()
+        assert (actual == np.array([[[3, 2, 1], [6, 5, 4]]], dtype=np.uint8)).all()
+
+    @staticmethod
+    def test_frozen_frame_reuses_screenshot_until_refreshed():
+        any_image = Screen()
+        fake_screenshot1 = PILImage.new("RGB", (100, 100))
+        fake_screenshot2 = PILImage.new("RGB", (10, 10))
+        pyautogui.screenshot = MagicMock(side_effect=[fake_screenshot1, fake_screenshot2])
+
+        with any_image.frozen_frame():
+            first_screenshot = any_image._get_numpy_image()
+            same_screenshot = any_image._get_numpy_image()
+            any_image.refresh()
+            second_screenshot = any_image._get_numpy_image()
+
+        assert pyautogui.screenshot.call_count == 2
+        assert first_screenshot is same_screenshot
+        assert second_screenshot.shape == (10, 10, 3)
+        assert any_image._frame is None
+
+    @staticmethod
+    def test_waiting_for_image_to_appear_only_searches_when_screen_changes():
+        any_image = Screen()
+        unchanged_screen = PILImage.new("RGB", (100, 100))
+        changed_screen = PILImage.new("RGB", (100, 100), "white")
+        pyautogui.screenshot = MagicMock(side_effect=[unchanged_screen] * 5 + [changed_screen] * 5)
+
+        with fake_clock(), mock.patch.object(Image, "find_all", return_value=[]) as find_all:
+            found = any_image.wait_until_appears("text", 0.8, 1, scans_per_second=10)
+
+        assert found == []
+        assert pyautogui.screenshot.call_count == 10
+        assert find_all.call_count == 2
+
+    @staticmethod
+    def test_waiting_for_image_to_vanish_only_searches_when_screen_changes():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(return_value=PILImage.new("RGB", (100, 100)))
+        match = MatchedRegionInImage(any_image, Region(0, 0, 1, 1), "text", 1.0)
+
+        with fake_clock(), mock.patch.object(Image, "find_all", return_value=[match]) as find_all:
+            vanished = any_image.wait_until_vanishes("text", 0.8, 1, scans_per_second=10)
+
+        assert vanished is False
+        assert pyautogui.screenshot.call_count == 10
+        find_all.assert_called_once()
+
+    @staticmethod
+    def test_waiting_for_image_to_appear_does_not_search_a_recent_screen_again():
+        any_image = Screen()
+        cursor_shown = PILImage.new("RGB", (100, 100))
+        cursor_hidden = PILImage.new("RGB", (100, 100), "white")
+        pyautogui.screenshot = MagicMock(side_effect=[cursor_shown, cursor_hidden] * 5)
+
+        with fake_clock(), mock.patch.object(Image, "find_all", return_value=[]) as find_all:
+            found = any_image.wait_until_appears("text", 0.8, 1, scans_per_second=10)
+
+        assert found == []
+        assert pyautogui.screenshot.call_count == 10
+        assert find_all.call_count == 2
+
+    @staticmethod
+    def test_waiting_for_image_to_appear_searches_a_screen_again_once_it_is_forgotten():
+        any_image = Screen()
+        screens = [
+            PILImage.new("RGB", (100, 100), (value, value, value)) for value in range(SCANNED_FRAMES_REMEMBERED + 1)
+        ]
+        pyautogui.screenshot = MagicMock(side_effect=screens * 2)
+
+        with fake_clock(), mock.patch.object(Image, "find_all", return_value=[]) as find_all:
+            any_image.wait_until_appears("text", 0.8, 2, scans_per_second=len(screens))
+
+        assert find_all.call_count == 2 * len(screens)
+
+    @staticmethod
+    def test_waiting_for_image_in_region_of_screen_searches_each_screenshot_once():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(
+            side_effect=[PILImage.new("RGB", (100, 100), (value, value, value)) for value in range(4)]
+        )
+        child_image = RegionInImage(any_image, Region(10, 20, 30, 40))
+
+        needle = Image(np.full((5, 5, 3), 255, dtype=np.uint8))
+
+        with fake_clock():
+            found = child_image.wait_until_image_appears(needle, 0.99, 0.4, scans_per_second=10)
+
+        assert found == []
+        assert pyautogui.screenshot.call_count == 4
+
+    @staticmethod
+    def test_searching_screen_with_shared_spectrum_keeps_needle_spectrum_between_screenshots():
+        any_image = Screen()
+        pyautogui.screenshot = MagicMock(return_value=PILImage.open(str(RESOURCES_DIR / "wiki-python-text.png")))
+        needle_image = Image(RESOURCES_DIR / "the.png")
+
+        with mock.patch.object(
+            _HaystackSpectrum, "transform_needle", autospec=True, side_effect=_HaystackSpectrum.transform_needle
+        ) as transform_needle:
+            first_found = any_image.find_image_all(needle_image, grayscale=False, shared_spectrum=True)
+            second_found = any_image.find_image_all(needle_image, grayscale=False, shared_spectrum=True)
+
+        transform_needle.assert_called_once()
+        assert any_image._haystack_spectra == {}
+        assert len(first_found) == len(second_found) == 4
+
     @staticmethod
     def test_calling_find_all_only_takes_one_screenshot():
         # Arrange
@@ -1552,3 +2393,114 @@ class TestScreen:
         # Assert
         saved_screenshot = PILImage.open(str(tmp_path / "out.png"))
         assert are_pil_images_equal(saved_screenshot, fake_screenshot)
+
+
+class TestHaystackSpectrum:
+    @staticmethod
+    @pytest.mark.parametrize("match_method", _HaystackSpectrum.METHODS)
+    @pytest.mark.parametrize("grayscale", [False, True])
+    def test_matching_template_matches_opencv(match_method, grayscale):
+        haystack = Image(RESOURCES_DIR / "wiki-python-text.png")
+        needle = Image(RESOURCES_DIR / "the.png")
+        if grayscale:
+            haystack_image, needle_image = haystack._get_grayscale_numpy_image(), needle._get_grayscale_numpy_image()
+        else:
+            haystack_image, needle_image = haystack._get_numpy_image(), needle._get_numpy_image()
+
+        actual = _HaystackSpectrum(haystack_image).match_template(needle_image, match_method)
+
+        expected = cv2.matchTemplate(haystack_image, needle_image, match_method)
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+    @staticmethod
+    def test_matching_template_with_unsupported_method_raises_value_error():
+        haystack = Image(RESOURCES_DIR / "the.png")
+
+        with pytest.raises(ValueError):
+            _HaystackSpectrum(haystack._get_numpy_image()).match_template(
+                haystack._get_numpy_image(), cv2.TM_CCOEFF_NORMED
+            )
+
+
+class TestMatchTemplate:
+    @staticmethod
+    @pytest.mark.parametrize("match_method", [cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED, cv2.TM_CCORR_NORMED])
+    @pytest.mark.parametrize("bands", [1, 3, 10_000])
+    def test_matching_template_in_bands_matches_opencv(match_method, bands):
+        haystack = Image(RESOURCES_DIR / "wiki-python-text.png")._get_numpy_image()[:200, :300]
+        needle = Image(RESOURCES_DIR / "the.png")._get_numpy_image()
+
+        actual = _match_template(needle, haystack, match_method, bands)
+
+        expected = cv2.matchTemplate(haystack, needle, match_method)
+        assert actual.shape == expected.shape
+        assert np.allclose(actual, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+
+class TestArraysEqual:
+    @staticmethod
+    @pytest.mark.parametrize("shape", [(300, 200, 3), (300, 200), (0, 200, 3), (20, 30, 3)])
+    def test_equal_arrays_are_equal(shape):
+        first = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+
+        assert _arrays_equal(first, first.copy())
+
+    @staticmethod
+    @pytest.mark.parametrize("location", [(0, 0, 0), (299, 199, 2)])
+    def test_arrays_differing_in_one_value_are_not_equal(location):
+        first = np.random.default_rng(0).integers(0, 256, (300, 200, 3), dtype=np.uint8)
+        second = first.copy()
+        second[location] ^= 1
+
+        assert not _arrays_equal(first, second)
+
+    @staticmethod
+    @pytest.mark.parametrize("location", [(0, 0, 0), (19, 29, 2)])
+    def test_small_arrays_differing_in_one_value_are_not_equal(location):
+        first = np.random.default_rng(0).integers(0, 256, (20, 30, 3), dtype=np.uint8)
+        second = first.copy()
+        second[location] ^= 1
+
+        assert not _arrays_equal(first, second)
+
+    @staticmethod
+    def test_small_array_is_equal_to_equal_slice_of_larger_array():
+        larger = np.random.default_rng(0).integers(0, 256, (300, 200, 3), dtype=np.uint8)
+
+        assert _arrays_equal(larger[10:30, 40:70].copy(), larger[10:30, 40:70])
+
+    @staticmethod
+    def test_array_is_equal_to_itself_without_comparing_values():
+        first = np.zeros((300, 200, 3), dtype=np.uint8)
+
+        with mock.patch("pin_the_tail.image.cv2.norm") as norm:
+            assert _arrays_equal(first, first)
+
+        norm.assert_not_called()
+
+    @staticmethod
+    def test_float_array_with_nan_is_not_equal_to_itself():
+        first = np.full((3, 2, 3), np.nan)
+
+        assert not _arrays_equal(first, first)
+
+    @staticmethod
+    def test_images_of_the_same_file_are_equal_without_comparing_pixels():
+        first = Image(RESOURCES_DIR / "wiki-python-text.png")
+        second = Image(RESOURCES_DIR / "wiki-python-text.png")
+
+        with mock.patch("pin_the_tail.image.cv2.norm") as norm:
+            assert first == second
+
+        norm.assert_not_called()
+
+    @staticmethod
+    def test_arrays_with_different_shapes_are_not_equal():
+        assert not _arrays_equal(np.zeros((3, 2, 3), dtype=np.uint8), np.zeros((2, 3, 3), dtype=np.uint8))
+
+    @staticmethod
+    def test_arrays_with_equal_values_but_different_datatypes_are_equal():
+        first = np.random.default_rng(0).integers(0, 256, (30, 20, 3), dtype=np.uint8)
+
+        assert _arrays_equal(first, first.astype(np.int64))
@@ -1,4 +1,6 @@
+import copy
 import math
+import pickle
 
 import pytest
 from hypothesis import given
@@ -56,8 +58,65 @@ class TestPoint:
         assert distance >= 0
         assert distance == pytest.approx(math.dist(point1_tuple, point2_tuple))
 
+    @staticmethod
+    def test_point_can_be_copied_and_pickled():
+        point = Point(13, 11)
+
+        assert copy.copy(point) == point
+        assert copy.deepcopy(point) == point
+        assert pickle.loads(pickle.dumps(point)) == point
+
 
 class TestRegion:
+    @staticmethod
+    def test_region_has_no_instance_dict():
+        region = Region(1, 2, 3, 4)
+
+        assert not hasattr(region, "__dict__")
+
+    @staticmethod
+    def test_region_can_be_copied_and_pickled():
+        region = Region(1, 2, 3, 4)
+
+        assert copy.copy(region) == region
+        assert copy.deepcopy(region) == region
+        assert pickle.loads(pickle.dumps(region)) == region
+
+    @staticmethod
+    def test_corner_points():
+        region = Region(1, 2, 3, 4)
+
+        assert region.min_point == Point(1, 2)
+        assert region.top_right == Point(4, 2)
+        assert region.bottom_left == Point(1, 6)
+        assert region.max_point == Point(4, 6)
+
+    @staticmethod
+    @given(
+        st.integers(-32_000, 32_000),
+        st.integers(-32_000, 32_000),
+        st.integers(0, 32_000),
+        st.integers(0, 32_000),
+    )
+    def test_center_is_halfway_between_edges(x, y, width, height):
+        region = Region(x, y, width, height)
+
+        assert region.center == Point((region.right + region.left) // 2, (region.bottom + region.top) // 2)
+
+    @staticmethod
+    @given(
+        st.tuples(st.integers(-50, 50), st.integers(-50, 50), st.integers(0, 50), st.integers(0, 50)),
+        st.tuples(st.integers(-50, 50), st.integers(-50, 50), st.integers(0, 50), st.integers(0, 50)),
+    )
+    def test_region_is_contained_when_both_of_its_corners_are_contained(container, contained):
+        container_region = Region(*container)
+        contained_region = Region(*contained)
+
+        assert container_region.contains(contained_region, overlap="all") == (
+            container_region.contains(contained_region.min_point)
+            and container_region.contains(contained_region.max_point)
+        )
+
     @staticmethod
     def test_point_contained_within_region():
         point = Point(2, 2)
@@ -1,3 +1,4 @@
+import re
 from difflib import SequenceMatcher
 from itertools import zip_longest
 from pathlib import Path
@@ -494,6 +495,34 @@ class TestOCRMatcher:
         for actual, expected in zip_longest(matcher._ocr_segments, ANY_IMAGE_TEXT_POSITIONS):
             assert_ocr_match_equal(actual, expected)
 
+    @staticmethod
+    def test_loading_text_with_rows_out_of_order_groups_them_by_paragraph_and_line():
+        any_image = Image(ANY_IMAGE_FILEPATH)
+        shuffled_output = ANY_IMAGE_RAW_TESSERACT_OUTPUT.sample(frac=1, random_state=0)
+        sorted_output = shuffled_output.sort_values(["page_num", "block_num", "par_num", "line_num"], kind="stable")
+        pytesseract.image_to_data = MagicMock(return_value=shuffled_output)
+        shuffled_matcher = OCRMatcher(any_image._get_numpy_image())
+        pytesseract.image_to_data = MagicMock(return_value=sorted_output)
+        sorted_matcher = OCRMatcher(any_image._get_numpy_image())
+
+        assert shuffled_matcher.text == sorted_matcher.text
+        assert [match.index_start for match in shuffled_matcher._ocr_segments] == [
+            match.index_start for match in sorted_matcher._ocr_segments
+        ]
+
+    @staticmethod
+    def test_changing_breaks_does_not_run_ocr_again():
+        any_image = Image(ANY_IMAGE_FILEPATH)
+        pytesseract.image_to_data = MagicMock(return_value=ANY_IMAGE_RAW_TESSERACT_OUTPUT)
+        matcher = OCRMatcher(any_image._get_numpy_image())
+
+        other_matcher = matcher.with_breaks("<line>", "<paragraph>")
+
+        pytesseract.image_to_data.assert_called_once()
+        assert matcher.text == ANY_IMAGE_TEXT
+        assert other_matcher.text == ANY_IMAGE_TEXT.replace("\n\n", "<paragraph>").replace("\n", "<line>")
+        assert other_matcher.language == matcher.language
+
 
 class TestFindingBoundingBoxes:
     @staticmethod
@@ -610,6 +639,39 @@ class TestFindingBoundingBoxes:
         ):
             assert_ocr_match_equal(actual, expected)
 
+    @staticmethod
+    def test_finding_first_word():
+        any_image = Image(ANY_IMAGE_FILEPATH)
+        pytesseract.image_to_data = MagicMock(return_value=ANY_IMAGE_RAW_TESSERACT_OUTPUT)
+        matcher = OCRMatcher(any_image._get_numpy_image())
+
+        result = matcher.find_bounding_boxes("Python")
+
+        assert result[0] == 0
+        assert result[1] == 6
+        for actual, expected in zip_longest(result[2], [ANY_IMAGE_TEXT_POSITIONS[0]]):
+            assert_ocr_match_equal(actual, expected)
+
+    @staticmethod
+    def test_finding_every_occurrence_of_a_word():
+        any_image = Image(ANY_IMAGE_FILEPATH)
+        pytesseract.image_to_data = MagicMock(return_value=ANY_IMAGE_RAW_TESSERACT_OUTPUT)
+        matcher = OCRMatcher(any_image._get_numpy_image())
+
+        result = matcher.find_bounding_boxes_all("Python")
+
+        assert [(index_start, index_end) for index_start, index_end, _ in result] == [(0, 6), (89, 95)]
+
+    @staticmethod
+    def test_finding_every_occurrence_of_a_compiled_regex():
+        any_image = Image(ANY_IMAGE_FILEPATH)
+        pytesseract.image_to_data = MagicMock(return_value=ANY_IMAGE_RAW_TESSERACT_OUTPUT)
+        matcher = OCRMatcher(any_image._get_numpy_image())
+
+        result = matcher.find_bounding_boxes_all(re.compile("python", re.IGNORECASE))
+
+        assert [(index_start, index_end) for index_start, index_end, _ in result] == [(0, 6), (89, 95)]
+
     @staticmethod
     def test_finding_two_words():
         any_image = Image(ANY_IMAGE_FILEPATH)